@@ -8,6 +8,19 @@ import threading
 import time
 from ..core.theme_manager import ThemeManager
 
+# geopandas se importa sólo al cargar el primer shapefile (arranque más rápido)
+_gpd = None
+
+
+def _get_geopandas():
+    """Módulo geopandas, importado una sola vez en la primera carga de shapefile"""
+    global _gpd
+    if _gpd is None:
+        import geopandas
+        _gpd = geopandas
+    return _gpd
+
+
 class FoliumMapViewer(ctk.CTkFrame):
     
     def __init__(self, parent, **kwargs):
@@ -440,13 +453,14 @@ class FoliumMapViewer(ctk.CTkFrame):
             color: Color del polígono (default: 'blue')
         """
         try:
-            import geopandas as gpd
+            gpd = _get_geopandas()
 
             # Leer shapefile
             gdf = gpd.read_file(shp_path)
 
-            # Asegurarse de que está en WGS84
-            if gdf.crs != 'EPSG:4326':
+            # Asegurarse de que está en WGS84 (comparación por código EPSG, sin
+            # construir un CRS ni comparar WKT)
+            if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
                 gdf = gdf.to_crs('EPSG:4326')
 
             # Convertir a GeoJSON y agregar al mapa
@@ -1,27 +1,112 @@
 import customtkinter as ctk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PathCollection
+from matplotlib.colors import Normalize
 from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.path import Path
 from matplotlib.ticker import FuncFormatter
 import contextily as ctx
+import mercantile
+import math
 import numpy as np
 import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
 from ..core.theme_manager import ThemeManager
 from ..core.language_manager import get_text
+from ..utils.tile_fetcher import fetch_tiles, prefetch_bounds, tiles_for_bounds
 
 try:
     import geopandas as gpd
     from shapely.geometry import Point
-    import mercantile
     GEOPANDAS_AVAILABLE = True
     print("Geopandas disponible ✅")
 except ImportError:
     GEOPANDAS_AVAILABLE = False
     print("Geopandas NO disponible ❌")
 
+
+# Web Mercator: radio de la esfera y semiancho del mundo (π·R) en metros
+_EARTH_R = 6378137.0
+_MERC_MAX = math.pi * _EARTH_R  # 20037508.342789244
+
+
+def _merc_y_to_lat(y):
+    """Latitud (°) de una coordenada Y Web Mercator: gd(y) = atan(sinh(y/R))"""
+    return math.degrees(math.atan(math.sinh(y / _EARTH_R)))
+
+# Pool para descargar/ensamblar mosaicos fuera del hilo de Tk (las teselas
+# individuales se descargan en el pool de tile_fetcher)
+_MOSAIC_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="basemap")
+
+# Pool para leer rasters (rasterio) fuera del hilo de Tk
+_RASTER_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="raster_io")
+
+# Pool para precargar en segundo plano teselas vecinas y de zoom ±1
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+# Proveedores de teselas por nombre del selector de mapa base
+_TILE_SOURCES = {
+    "OpenStreetMap": ctx.providers.OpenStreetMap.Mapnik,
+    "CartoDB Positron": ctx.providers.CartoDB.Positron,
+    "CartoDB Voyager": ctx.providers.CartoDB.Voyager,  # Buena cobertura global
+    "ESRI World Imagery": ctx.providers.Esri.WorldImagery,  # Imágenes satelitales
+    "Stamen Terrain": ctx.providers.Stamen.Terrain
+}
+
+# Zoom máximo disponible por proveedor
+_MAX_ZOOM_LIMITS = {
+    "OpenStreetMap": 18,
+    "CartoDB Positron": 19,
+    "CartoDB Voyager": 19,
+    "ESRI World Imagery": 20,
+    "Stamen Terrain": 17
+}
+
+# Colormaps matplotlib por nombre del selector de rampa de colores
+_COLORMAPS = {
+    "Viridis": plt.cm.viridis,        # Azul-Verde-Amarillo clásico
+    "Verde-Rojo": plt.cm.RdYlGn_r,    # Rojo-Amarillo-Verde (bueno para riesgo)
+    "Tierra": plt.cm.terrain,         # Colores naturales tierra
+    "Plasma": plt.cm.plasma,          # Púrpura-Rosa-Amarillo
+    "Océano": plt.cm.ocean            # Azul-Verde océano
+}
+
+
 class MatplotlibMapViewer(ctk.CTkFrame):
-    
+
+    # Constantes Web Mercator precalculadas (evitan divisiones por tick)
+    _MERC_TO_DEG = 180 / _MERC_MAX       # x (m) -> longitud (°)
+    _INV_MERC = 1 / _EARTH_R             # y (m) -> argumento de la gudermanniana
+    _MERC_MAX_LAT = 85.0511287798        # latitud límite de Web Mercator (°)
+
+    # Rasters: se lee 1.5x la vista (margen para pans cortos sin releer) y se
+    # vuelve a muestrear sólo si el zoom cambia más de este factor
+    _RASTER_OVERSAMPLE = 1.5
+    _RASTER_RESAMPLE_ZOOM = 1.25
+
+    # Hasta este zoom (vista de continente/mundo) el mapa base es un mosaico del
+    # mundo entero ensamblado una vez por proveedor y reutilizado sin red
+    _WORLD_ZOOM_MAX = 3
+    _WORLD_BOUNDS = (-_MERC_MAX, -_MERC_MAX, _MERC_MAX, _MERC_MAX)
+
+    # Rasters de visualización: el rango fijo 0-1 se cuantiza a códigos uint8
+    _RASTER_LEVELS = 255
+
+    # Caché de teselas: vistas de teselas que caben en memoria (~5 pantallas)
+    _TILE_CACHE_SCREENS = 5
+
+    # Fallos seguidos del mapa base tras los que se deja de pedir teselas en
+    # pan/zoom (proveedor caído) hasta que el usuario cambia de mapa o resetea
+    _BASEMAP_MAX_FAILURES = 5
+
     def __init__(self, parent, hide_colormap_controls=False, reset_callback=None, **kwargs):
         super().__init__(parent, **kwargs)
 
@@ -40,8 +125,7 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         self.rectangle_callback = None
 
         # Variables para dibujo de rectángulo
-        self.rect_start_x = None
-        self.rect_start_y = None
+        self.rect_start = None  # (x, y) del primer clic, o None si falta
         self.temp_marker = None  # Punto temporal del primer clic
         self.current_rectangle = None  # Rectángulo actual (solo el último)
         self.drawn_rectangle_coords = None
@@ -64,17 +148,95 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         self._tile_source = None
         self._reload_job = None
 
+        # Caché en memoria de teselas decodificadas {(proveedor, z, x, y): ndarray RGBA}
+        # (LRU acotado: tras un pan pequeño sólo se descargan las teselas del borde;
+        # el límite se ajusta al tamaño del canvas en _resize_tile_cache)
+        self._tile_cache = OrderedDict()
+        self._tile_cache_max = 150
+        self._tile_cache_lock = threading.Lock()
+
+        # Id de la última petición de mosaico (descarta resultados obsoletos)
+        self._basemap_request_id = 0
+
+        # Mosaicos del mundo a zoom bajo {(proveedor, z): (img, extent)}
+        self._world_mosaics = {}
+
+        # Precargas pendientes (se cancelan cuando cambia la vista)
+        self._prefetch_futures = []
+
+        # Última vista pedida (límites redondeados a 10 m, zoom, proveedor):
+        # evita volver a pedir teselas para la misma vista
+        self._last_basemap_key = None
+
+        # Mosaicos fallidos seguidos (ver _BASEMAP_MAX_FAILURES)
+        self._basemap_fail_count = 0
+
+        # _draw_basemap_safe espera el mosaico para actualizar el label de estado
+        self._basemap_status_pending = False
+
+        # Buffer RGBA reutilizado para ensamblar mosaicos (crece al tamaño máximo
+        # visto; None mientras un hilo de trabajo lo está usando)
+        self._mosaic_buf = None
+
         # Control de repintado y labels
         self._basemap_im = None
         self._current_zoom = None
         self._tile_source = None
         self._reload_job = None
 
+        # Colormaps ya configurados (set_bad) por nombre, para no mutarlos en cada carga
+        self._masked_cmaps = {}
+
+        # Ruta y extensión completa (EPSG:3857) de cada raster cargado
+        self._raster_sources = {}
+
+        # Capas de add_shapefile_layer: polígonos completos en EPSG:3857 y la parte
+        # dibujada (recortada a la vista y simplificada al tamaño de píxel)
+        self._shapefile_sources = {}
+
+        # Extensión conjunta [left, right, bottom, top] de todos los rasters cargados
+        self._raster_bounds_all = None
+
+        # Lecturas de raster en curso {layer_name: token}; remove_raster_layer las anula
+        self._raster_loads = {}
+
+        # Relecturas por ventana tras pan/zoom: sólo se aplican las de la última vista
+        self._raster_refresh_id = 0
+
+        # Transformers de pyproj reutilizados {(crs origen, crs destino): Transformer}
+        self._transformer_cache = {}
+
+        # Vectores ya leídos y reproyectados {(ruta, mtime): GeoDataFrame EPSG:3857} (LRU)
+        self._vector_cache = OrderedDict()
+        self._vector_cache_max = 16
+
         self._last_paint_ms = 0  # throttle de dibujo (ms)
         self._last_coords_ms = 0  # throttle coords (ms)
-        self._pan_fast_mode = False  # interp. rápida durante el pan
+        self._current_interp = None  # interpolación aplicada al mapa base
+        self._reload_due = 0.0  # plazo (perf_counter, s) del refresco diferido
+        self._reload_fire_at = 0.0  # cuándo dispara el temporizador pendiente
+
+        # Blitting durante el pan: fondo del axes y artistas que se mueven
+        self._pan_bg = None
+        self._pan_artists = []
+
+        # Blitting del marcador: fondo del axes sin el marcador (se invalida en
+        # cualquier repintado completo, ver _on_canvas_draw)
+        self._marker_bg = None
+        self._capturing_marker_bg = False
+
+        # Blitting del punto temporal del rectángulo: fondo capturado en el último
+        # repintado completo en modo rectángulo, antes del primer clic
+        self._rect_bg = None
 
         self._setup_ui()
+
+        # Selección actual cacheada: sólo cambia en _change_map_type / _change_colormap
+        self._tile_source_cached = _TILE_SOURCES.get(
+            self.map_type_var.get(), ctx.providers.OpenStreetMap.Mapnik
+        )
+        self._colormap_cached = _COLORMAPS.get(self.colormap_var.get(), plt.cm.viridis)
+
         self._create_map()
 
         # Precarga deshabilitada: con caché persistente en AppData, solo descargamos bajo demanda
@@ -109,9 +271,6 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         Precalienta/descarga a caché local las teselas de un BBOX (WGS84) para zmin..zmax.
         Corre en segundo plano, pero TODA actualización de UI se enruta al hilo principal.
         """
-        import threading
-        import contextily as ctx
-
         # Helper seguro para UI
         def _ui(update_fn, *args, **kwargs):
             try:
@@ -134,12 +293,11 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             try:
                 _set_status("📦 Precargando tiles...", "info")
                 for z in range(int(zmin), int(zmax) + 1):
-                    # Nota: bbox en WGS84 ⇒ ll=True
-                    img, ext = ctx.bounds2img(
-                        lon_min, lat_min, lon_max, lat_max,
-                        source=src, zoom=z, ll=True, use_cache=True
+                    # Nota: bbox en WGS84 ⇒ ll=True; descarga en paralelo sin ensamblar mosaico
+                    n_tiles = prefetch_bounds(
+                        src, (lon_min, lat_min, lon_max, lat_max), z, ll=True
                     )
-                    print(f"Precache z={z}: {img.shape}")
+                    print(f"Precache z={z}: {n_tiles} teselas")
                 _set_status(f"✅ Precarga completa z={zmin}..{zmax}", "success")
             except Exception as e:
                 print(f"❌ Precarga error: {e}")
@@ -147,7 +305,12 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
         threading.Thread(target=_worker, daemon=True).start()
 
-    def _draw_basemap(self, xlim=None, ylim=None, force=False):
+    def _draw_basemap(self, xlim=None, ylim=None, force=False, retry_count=None):
+        """
+        Pide el mosaico de la vista al pool de trabajo. Retorna True si quedó una
+        descarga en curso (el resultado llega a _apply_basemap); retry_count viene
+        de _draw_basemap_safe, que reintenta los mosaicos fallidos.
+        """
         try:
             # Validar que ax existe y está en estado válido
             if self.ax is None:
@@ -168,6 +331,11 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 print(f"❌ _draw_basemap: axes no listo (get_xlim/ylim falló), skipping")
                 return
 
+            # Proveedor caído: pan/zoom no vuelven a esperar timeouts HTTP
+            # (cambiar de mapa o resetear la vista fuerza un nuevo intento)
+            if not force and self._basemap_fail_count >= self._BASEMAP_MAX_FAILURES:
+                return
+
             xmin, xmax = xlim;
             ymin, ymax = ylim
 
@@ -179,37 +347,44 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             boost = 0  # prueba 1 si quieres aún más detalle
             zoom = base_zoom + boost
 
-            # Evita trabajo inútil
-            if (not force and
-                    self._basemap_im is not None and
-                    zoom == self._current_zoom and
-                    tile_source == self._tile_source):
-                return
-
-            img, extent = ctx.bounds2img(
-                xmin, ymin, xmax, ymax,
-                source=tile_source, zoom=zoom,
-                ll=False, use_cache=True
+            provider_name = tile_source.get('name', str(tile_source))
+            world = zoom <= self._WORLD_ZOOM_MAX
+            if world:
+                # Zoom bajo: un mosaico del mundo entero sirve para cualquier pan
+                view_key = ('world', zoom, provider_name)
+                if not force and self._basemap_im is not None and view_key == self._last_basemap_key:
+                    return
+                cached = self._world_mosaics.get((provider_name, zoom))
+                if cached is not None:
+                    # Ya ensamblado: se muestra al instante, sin red ni hilo de trabajo
+                    self._last_basemap_key = view_key
+                    self._basemap_request_id += 1
+                    self._show_basemap(cached[0], cached[1], zoom, tile_source, ylim)
+                    return
+                xmin, ymin, xmax, ymax = self._WORLD_BOUNDS
+            else:
+                # Evita trabajo inútil: misma vista (±10 m), mismo zoom y mismo proveedor
+                view_key = (
+                    round(xmin / 10), round(xmax / 10), round(ymin / 10), round(ymax / 10),
+                    zoom, provider_name
+                )
+                if not force and self._basemap_im is not None and view_key == self._last_basemap_key:
+                    return
+            self._last_basemap_key = view_key
+
+            # Descarga y ensamblado del mosaico fuera del hilo de Tk; sólo el
+            # resultado final vuelve al hilo principal (ver _apply_basemap)
+            self._basemap_request_id += 1
+            request_id = self._basemap_request_id
+            future = _MOSAIC_POOL.submit(
+                self._mosaic_from_tiles, xmin, ymin, xmax, ymax, zoom, tile_source
             )
-
-            if self._basemap_im is None:
-                self._basemap_im = self.ax.imshow(
-                    img, extent=extent, zorder=0,
-                    interpolation='bilinear' if not self._pan_fast_mode else 'nearest'
+            future.add_done_callback(
+                lambda f: self._on_mosaic_ready(
+                    f, request_id, zoom, tile_source, xlim, ylim, world, retry_count
                 )
-            else:
-                self._basemap_im.set_data(img)
-                self._basemap_im.set_extent(extent)
-                # Mantén bilinear fuera del pan (es más bonito)
-                if not self._pan_fast_mode:
-                    try:
-                        self._basemap_im.set_interpolation('bilinear')
-                    except:
-                        pass
-
-            self._current_zoom = zoom
-            self._tile_source = tile_source
-            self.canvas.draw_idle()
+            )
+            return True
 
         except (AttributeError, TypeError) as e:
             # Error típico cuando axes no está completamente inicializado
@@ -228,6 +403,283 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 pass
             raise
 
+    def _on_mosaic_ready(self, future, request_id, zoom, tile_source, xlim, ylim,
+                         world=False, retry_count=None):
+        """Callback del hilo de trabajo: enruta el mosaico al hilo de Tk"""
+        try:
+            # after(ms, func, *args): método ligado con argumentos, sin lambda por mosaico
+            self.after(0, self._apply_basemap, future, request_id, zoom, tile_source,
+                       xlim, ylim, world, retry_count)
+        except Exception:
+            # El widget ya fue destruido
+            pass
+
+    def _apply_basemap(self, future, request_id, zoom, tile_source, xlim, ylim,
+                       world=False, retry_count=None):
+        """
+        Muestra el mosaico descargado (hilo de Tk); descarta resultados obsoletos.
+        Actualiza el label de estado pendiente de _draw_basemap_safe y, si el mosaico
+        vino de allí y falló, lo reintenta con el mismo backoff.
+        """
+        img = None
+        if request_id != self._basemap_request_id:
+            # Llegó una petición más reciente (pan/zoom posterior)
+            if future.exception() is None:
+                self._release_mosaic_buf(future.result()[0])
+            return
+
+        try:
+            img, extent = future.result()
+
+            if world:
+                # Copia propia (img es una vista del buffer reutilizado)
+                provider_name = tile_source.get('name', str(tile_source))
+                self._world_mosaics[(provider_name, zoom)] = (np.array(img, dtype=np.uint8), extent)
+
+            self._show_basemap(img, extent, zoom, tile_source, ylim)
+            self._basemap_fail_count = 0
+            if self._basemap_status_pending:
+                self._set_basemap_status(True)
+
+            # Con la vista ya pintada, precargar vecinas y zoom ±1 en segundo plano
+            self._start_prefetch(zoom, tile_source, request_id)
+
+        except Exception as e:
+            print(f"❌ _draw_basemap error: {e}")
+            # La vista no quedó pintada: permitir reintentarla
+            self._last_basemap_key = None
+            self._basemap_fail_count += 1
+            if self._basemap_fail_count == self._BASEMAP_MAX_FAILURES:
+                print(f"⚠️ Mapa base: {self._basemap_fail_count} fallos seguidos, "
+                      f"se pausa la descarga de teselas hasta cambiar de mapa o resetear la vista")
+            try:
+                self.ax.set_facecolor('#E8E8E8')
+                self.canvas.draw_idle()
+            except:
+                pass
+
+            if retry_count is not None and retry_count < 5:
+                # Errores de red: mismo backoff que _draw_basemap_safe
+                delay = 150 * (retry_count + 1)
+                self.after(delay, self._draw_basemap_safe, xlim, ylim, retry_count + 1)
+            elif self._basemap_status_pending:
+                self._set_basemap_status(False)
+        finally:
+            # imshow/set_data copian los datos: el buffer ya puede reutilizarse
+            if img is not None:
+                self._release_mosaic_buf(img)
+
+    def _show_basemap(self, img, extent, zoom, tile_source, ylim):
+        """Pone un mosaico en el imshow persistente del mapa base (hilo de Tk)"""
+        # RGBA uint8: AGG compone directamente sin buffer float ni normalización
+        img = np.asarray(img, dtype=np.uint8)
+
+        # Vecino más cercano durante el pan, bilinear fuera (es más bonito)
+        interp = 'nearest' if self.is_panning else 'bilinear'
+        if self._basemap_im is None:
+            self._basemap_im = self.ax.imshow(
+                img, extent=extent, zorder=0,
+                interpolation=interp, filternorm=(interp != 'nearest'),
+                resample=False
+            )
+            self._current_interp = interp
+        else:
+            self._basemap_im.set_data(img)
+            self._basemap_im.set_extent(extent)
+            self._set_basemap_interp(interp)
+
+        self._current_zoom = zoom
+        self._tile_source = tile_source
+        self.canvas.draw_idle()
+
+    def _cancel_prefetch(self):
+        """Cancela las precargas que aún no empezaron (la vista va a cambiar)"""
+        for future in self._prefetch_futures:
+            future.cancel()
+        self._prefetch_futures = []
+
+    def _start_prefetch(self, zoom, tile_source, request_id):
+        """
+        Precarga en segundo plano el anillo de teselas alrededor de la vista y
+        las teselas de zoom ±1, para que el siguiente pan o zoom no parpadee.
+        """
+        try:
+            self._cancel_prefetch()
+            xmin, xmax = self.ax.get_xlim()
+            ymin, ymax = self.ax.get_ylim()
+            max_zoom = _MAX_ZOOM_LIMITS.get(self.map_type_var.get(), 18)
+
+            # Vista ampliada una tesela por lado (anillo de vecinas al zoom actual)
+            tile_m = 2 * _MERC_MAX / (2 ** zoom)
+            ring = (xmin - tile_m, ymin - tile_m, xmax + tile_m, ymax + tile_m)
+
+            jobs = [(ring, zoom)]
+            if zoom + 1 <= max_zoom:
+                jobs.append(((xmin, ymin, xmax, ymax), zoom + 1))
+            if zoom - 1 >= 0:
+                jobs.append((ring, zoom - 1))
+
+            for bounds, z in jobs:
+                self._prefetch_futures.append(_PREFETCH_POOL.submit(
+                    self._prefetch_tiles, bounds, z, tile_source, request_id
+                ))
+        except Exception as e:
+            print(f"⚠️ Error programando precarga de teselas: {e}")
+
+    def _prefetch_tiles(self, bounds, zoom, tile_source, request_id):
+        """
+        Descarga (hilo de trabajo) las teselas de un BBOX que no están en memoria.
+        Sólo ocupan capacidad libre del LRU (entran como las menos recientes): nunca
+        desalojan otras teselas, y con la caché llena no se precarga nada.
+        """
+        if request_id != self._basemap_request_id:
+            # La vista ya cambió: esta precarga quedó obsoleta
+            return
+
+        provider_name = tile_source.get('name', str(tile_source))
+        limit = _MERC_MAX
+        xmin, ymin, xmax, ymax = bounds
+        tiles = tiles_for_bounds(
+            max(xmin, -limit), max(ymin, -limit), min(xmax, limit), min(ymax, limit), zoom
+        )
+
+        required = {(provider_name, t.z, t.x, t.y): t for t in tiles}
+        with self._tile_cache_lock:
+            missing_keys = required.keys() - self._tile_cache.keys()
+            free = self._tile_cache_max - len(self._tile_cache)
+        if not missing_keys or free <= 0:
+            return
+        missing = [required[key] for key in sorted(missing_keys)[:free]]
+        fetched = fetch_tiles(tile_source, missing)
+
+        cache = self._tile_cache
+        with self._tile_cache_lock:
+            for t, array in zip(missing, fetched):
+                if len(cache) >= self._tile_cache_max:
+                    # La vista llenó la caché mientras tanto: no desalojar por precargar
+                    break
+                key = (provider_name, t.z, t.x, t.y)
+                if array is not None and key not in cache:
+                    cache[key] = array
+                    cache.move_to_end(key, last=False)
+
+    def _resize_tile_cache(self):
+        """
+        Ajusta el límite de la caché de teselas al área del canvas:
+        ceil(ancho/256 + 1) * ceil(alto/256 + 1) teselas por pantalla, por varias
+        pantallas (una caché pequeña se vacía en pans de ida y vuelta).
+        """
+        try:
+            width, height = self.canvas.get_width_height()
+            per_screen = math.ceil(width / 256 + 1) * math.ceil(height / 256 + 1)
+            self._tile_cache_max = max(per_screen * self._TILE_CACHE_SCREENS, 64)
+
+            # Si el canvas se achicó, descartar las menos usadas
+            with self._tile_cache_lock:
+                while len(self._tile_cache) > self._tile_cache_max:
+                    self._tile_cache.popitem(last=False)
+        except Exception as e:
+            print(f"⚠️ Error ajustando caché de teselas: {e}")
+
+    def _acquire_mosaic_buf(self, rows, cols):
+        """
+        Toma el buffer de mosaico (hilo de trabajo) o crea uno si está ocupado
+        o es pequeño. Crece al máximo visto, así los pans siguientes no asignan.
+        """
+        with self._tile_cache_lock:
+            buf, self._mosaic_buf = self._mosaic_buf, None
+        if buf is None or buf.shape[0] < rows or buf.shape[1] < cols:
+            shape_h = max(rows, buf.shape[0] if buf is not None else 0)
+            shape_w = max(cols, buf.shape[1] if buf is not None else 0)
+            buf = np.empty((shape_h, shape_w, 4), dtype=np.uint8)
+        return buf
+
+    def _release_mosaic_buf(self, img):
+        """Devuelve el buffer del que 'img' es una vista para el próximo mosaico"""
+        buf = img.base if isinstance(img, np.ndarray) else None
+        if not isinstance(buf, np.ndarray) or buf.ndim != 3:
+            return
+        with self._tile_cache_lock:
+            current = self._mosaic_buf
+            if current is None or current.size < buf.size:
+                self._mosaic_buf = buf
+
+    def _mosaic_from_tiles(self, xmin, ymin, xmax, ymax, zoom, tile_source):
+        """
+        Ensambla el mosaico de teselas que cubre el BBOX (EPSG:3857) a un zoom.
+        Reutiliza las teselas ya decodificadas en self._tile_cache y descarga
+        en paralelo sólo las que faltan.
+
+        Returns:
+            (img uint8 RGBA, extent (west, east, south, north) en EPSG:3857),
+            igual que ctx.bounds2img
+        """
+        provider_name = tile_source.get('name', str(tile_source))
+        tiles = tiles_for_bounds(xmin, ymin, xmax, ymax, zoom)
+        if not tiles:
+            raise ValueError(f"Sin teselas para el BBOX a zoom {zoom}")
+
+        cache = self._tile_cache
+
+        # Descargar en paralelo sólo las teselas que no están en memoria
+        # (corre en un hilo de trabajo: la caché se protege con un lock)
+        # Diferencia de conjuntos entre las teselas necesarias y las ya en memoria
+        required = {(provider_name, t.z, t.x, t.y): t for t in tiles}
+        with self._tile_cache_lock:
+            missing_keys = required.keys() - cache.keys()
+        missing = [required[key] for key in sorted(missing_keys)]
+        fetched = fetch_tiles(tile_source, missing) if missing else []
+
+        arrays = []
+        with self._tile_cache_lock:
+            for t, array in zip(missing, fetched):
+                if array is not None:
+                    cache[(provider_name, t.z, t.x, t.y)] = array
+
+            for t in tiles:
+                key = (provider_name, t.z, t.x, t.y)
+                array = cache.get(key)
+                if array is not None:
+                    cache.move_to_end(key)
+                arrays.append(array)
+
+            # Descartar las menos usadas si se supera el límite
+            while len(cache) > self._tile_cache_max:
+                cache.popitem(last=False)
+
+        available = [a for a in arrays if a is not None]
+        if not available:
+            raise ValueError(f"No se pudo descargar ninguna tesela (z={zoom})")
+
+        # Rango de índices de teselas y tamaño (256 px, 512 px en proveedores @2x)
+        x0 = min(t.x for t in tiles)
+        x1 = max(t.x for t in tiles)
+        y0 = min(t.y for t in tiles)
+        y1 = max(t.y for t in tiles)
+        tile_h, tile_w = available[0].shape[:2]
+
+        # Ensamblado sobre una vista del buffer reutilizado (sin asignar un array
+        # nuevo ni intermedios por fila en cada pan); las teselas que faltan
+        # quedan transparentes
+        rows = (y1 - y0 + 1) * tile_h
+        cols = (x1 - x0 + 1) * tile_w
+        buf = self._acquire_mosaic_buf(rows, cols)
+        img = buf[:rows, :cols]
+        for t, array in zip(tiles, arrays):
+            r = (t.y - y0) * tile_h
+            c = (t.x - x0) * tile_w
+            if array is not None and array.shape == (tile_h, tile_w, 4):
+                img[r:r + tile_h, c:c + tile_w] = array
+            else:
+                img[r:r + tile_h, c:c + tile_w] = 0
+
+        # Extensión del mosaico: esquina NO de la primera tesela y SE de la última
+        nw = mercantile.xy_bounds(mercantile.Tile(x0, y0, zoom))
+        se = mercantile.xy_bounds(mercantile.Tile(x1, y1, zoom))
+        extent = (nw.left, se.right, se.bottom, nw.top)
+
+        return img, extent
+
     def _create_toolbar(self, parent):
         toolbar_container = ctk.CTkFrame(parent, fg_color="transparent")
         toolbar_container.pack(fill="x", padx=15, pady=10)
@@ -377,6 +829,8 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             self.canvas.mpl_connect('button_release_event', self._on_mouse_release)
             self.canvas.mpl_connect('motion_notify_event', self._on_mouse_move)
             self.canvas.mpl_connect('scroll_event', self._on_scroll)
+            self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
+            self.canvas.mpl_connect('resize_event', lambda event: self._resize_tile_cache())
             
             # Hacer que el canvas pueda recibir focus para eventos
             self.canvas.get_tk_widget().focus_set()
@@ -392,13 +846,14 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             self.status_label.configure(text=get_text("map_viewer.loading", "🔄 Cargando..."), text_color=ThemeManager.COLORS['warning'])
 
             self.ax.clear()
+            # Límites siempre explícitos: sin autoescalado al añadir imágenes/vectores
+            self.ax.set_autoscale_on(False)
 
             # Configurar límites iniciales (EPSG:3857)
             west, south, east, north = self._get_bounds_from_center(
                 self.center_lat, self.center_lon, self.zoom_level
             )
-            self.ax.set_xlim(west, east)
-            self.ax.set_ylim(south, north)
+            self._set_view((west, east), (south, north))
 
             # Apariencia (menos costo de repintado)
             # adjustable='box' fija el tamaño del axes, aspect='equal' mantiene proporciones del mapa
@@ -412,11 +867,14 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             # Forzar actualización del canvas para que axes se inicialice completamente
             self.canvas.draw_idle()
 
+            # Tamaño de la caché de teselas según el canvas
+            self._resize_tile_cache()
+
             # Pintar basemap después de dar tiempo a que axes se inicialice
             # Pasamos los límites explícitamente para evitar get_xlim/ylim en axes recién limpiado
             xlim = (west, east)
             ylim = (south, north)
-            self.after(100, lambda: self._draw_basemap_safe(xlim, ylim))
+            self.after(100, self._draw_basemap_safe, xlim, ylim)
 
         except Exception as e:
             self._show_error(f"Error al cargar mapa: {str(e)}")
@@ -436,31 +894,40 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 if retry_count < 5:  # Aumentar a 5 reintentos
                     # Esperar más y reintentar
                     delay = 150 * (retry_count + 1)  # 150ms, 300ms, 450ms, 600ms, 750ms
-                    self.after(delay, lambda: self._draw_basemap_safe(xlim, ylim, retry_count + 1))
+                    self.after(delay, self._draw_basemap_safe, xlim, ylim, retry_count + 1)
                     return
                 else:
                     error_msg = "❌ Axes no se inicializó después de varios reintentos"
                     print(error_msg)
-                    self.status_label.configure(
-                        text=get_text("map_viewer.map_error", "⚠️ Error al cargar mapa"),
-                        text_color=ThemeManager.COLORS['error']
-                    )
+                    self._set_basemap_status(False)
                     return
 
-            self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
-            self.status_label.configure(text=get_text("map_viewer.map_loaded", "✅ Mapa cargado"), text_color=ThemeManager.COLORS['success'])
+            # El estado final lo pone _apply_basemap cuando el mosaico termina
+            self._basemap_status_pending = True
+            if not self._draw_basemap(xlim=xlim, ylim=ylim, force=True, retry_count=retry_count):
+                # Sin descarga en curso (p.ej. mosaico del mundo ya en memoria)
+                self._set_basemap_status(True)
         except Exception as e:
             if retry_count < 5:  # Aumentar a 5 reintentos
                 # Si falla, reintentar
                 delay = 150 * (retry_count + 1)
-                self.after(delay, lambda: self._draw_basemap_safe(xlim, ylim, retry_count + 1))
+                self.after(delay, self._draw_basemap_safe, xlim, ylim, retry_count + 1)
             else:
                 error_msg = f"Error en _draw_basemap_safe después de {retry_count} reintentos: {e}"
                 print(error_msg)
-                self.status_label.configure(
-                    text=get_text("map_viewer.map_error", "⚠️ Error al cargar mapa"),
-                    text_color=ThemeManager.COLORS['error']
-                )
+                self._set_basemap_status(False)
+
+    def _set_basemap_status(self, loaded):
+        """Label de estado tras cargar (o no) el mapa base"""
+        self._basemap_status_pending = False
+        if loaded:
+            self.status_label.configure(text=get_text("map_viewer.map_loaded", "✅ Mapa cargado"),
+                                        text_color=ThemeManager.COLORS['success'])
+        else:
+            self.status_label.configure(
+                text=get_text("map_viewer.map_error", "⚠️ Error al cargar mapa"),
+                text_color=ThemeManager.COLORS['error']
+            )
 
     def _create_map_overlay(self):
         """
@@ -475,35 +942,31 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             print(f"❌ Error en overlay: {e}")
 
     def _get_tile_source(self):
-        """Obtener fuente de tiles según selección"""
-        map_type = self.map_type_var.get()
-        
-        sources = {
-            "OpenStreetMap": ctx.providers.OpenStreetMap.Mapnik,
-            "CartoDB Positron": ctx.providers.CartoDB.Positron,
-            "CartoDB Voyager": ctx.providers.CartoDB.Voyager,  # Buena cobertura global
-            "ESRI World Imagery": ctx.providers.Esri.WorldImagery,  # Imágenes satelitales
-            "Stamen Terrain": ctx.providers.Stamen.Terrain
-        }
-        
-        return sources.get(map_type, ctx.providers.OpenStreetMap.Mapnik)
+        """Obtener fuente de tiles según selección (cacheada al cambiar el selector)"""
+        return self._tile_source_cached
 
     def _get_colormap(self):
-        """Obtener colormap matplotlib según selección"""
-        colormap_name = self.colormap_var.get()
+        """Obtener colormap matplotlib según selección (cacheado al cambiar el selector)"""
+        return self._colormap_cached
 
-        colormap_mappings = {
-            "Viridis": plt.cm.viridis,        # Azul-Verde-Amarillo clásico
-            "Verde-Rojo": plt.cm.RdYlGn_r,    # Rojo-Amarillo-Verde (bueno para riesgo)
-            "Tierra": plt.cm.terrain,         # Colores naturales tierra
-            "Plasma": plt.cm.plasma,          # Púrpura-Rosa-Amarillo
-            "Océano": plt.cm.ocean            # Azul-Verde océano
-        }
+    def _configure_cmap(self, cmap):
+        """Copia del colormap con valores no válidos (NaN/nodata) transparentes"""
+        cmap = cmap.copy()
+        cmap.set_bad(alpha=0)
+        return cmap
 
-        return colormap_mappings.get(colormap_name, plt.cm.viridis)
+    def _get_masked_colormap(self):
+        """Colormap seleccionado con set_bad aplicado una sola vez (cacheado por nombre)"""
+        colormap_name = self.colormap_var.get()
+        cmap = self._masked_cmaps.get(colormap_name)
+        if cmap is None:
+            cmap = self._configure_cmap(self._get_colormap())
+            self._masked_cmaps[colormap_name] = cmap
+        return cmap
 
     def _change_colormap(self, colormap_name):
         """Cambiar colormap de todos los rasters cargados"""
+        self._colormap_cached = _COLORMAPS.get(colormap_name, plt.cm.viridis)
         try:
             if not hasattr(self, 'raster_layers') or not self.raster_layers:
                 # No hay rasters cargados, solo mostrar mensaje
@@ -513,8 +976,7 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             print(f"🎨 Cambiando colormap de {len(self.raster_layers)} rasters a {colormap_name}...")
 
             # Obtener el colormap correspondiente
-            new_cmap = self._get_colormap()
-            new_cmap.set_bad(alpha=0)  # Valores no válidos transparentes
+            new_cmap = self._get_masked_colormap()  # Valores no válidos transparentes
 
             # Aplicar el nuevo colormap a todos los rasters cargados
             for layer_name, raster_plot in self.raster_layers.items():
@@ -522,15 +984,12 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
             # Actualizar colorbar si existe
             if hasattr(self, 'raster_colorbar') and self.raster_colorbar is not None:
-                # Obtener el último raster cargado (el que está visible)
-                if self.raster_layers:
-                    last_raster = list(self.raster_layers.values())[-1]
-                    self.raster_colorbar.mappable = last_raster
-                    self.raster_colorbar.update_normal(last_raster)
-                    print(f"✓ Colorbar actualizado con nuevo colormap")
+                self._colorbar_mappable.set_cmap(new_cmap)
+                self.raster_colorbar.update_normal(self._colorbar_mappable)
+                print(f"✓ Colorbar actualizado con nuevo colormap")
 
             # Actualizar canvas
-            self.canvas.draw()
+            self.canvas.draw_idle()
 
             print(f"✅ Colormap {colormap_name} aplicado exitosamente a todos los rasters")
 
@@ -562,22 +1021,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             target_mpp = width_m / (widget_w * oversample)
 
             # 4) Resolución a nivel z (m/px) para tile 256 px (WebMercator en el ecuador)
-            # res(z) = 156543.03392804097 / 2^z
-            import math
-            raw_zoom = math.log2(156543.03392804097 / target_mpp)
-            zoom_level = int(max(0, math.floor(raw_zoom)))  # entero hacia abajo
+            # res(z) = 156543.03392804097 / 2^z  ⇒  z = floor(log2(ratio)) = bit_length - 1
+            ratio = int(156543.03392804097 / target_mpp)
+            zoom_level = max(0, ratio.bit_length() - 1)  # entero hacia abajo
 
             # 5) Límite por proveedor (no pidas más de lo que existe)
             # z=4-8 precargado; z>8 se descarga bajo demanda solo para zonas exploradas
-            map_type = self.map_type_var.get()
-            max_zoom_limits = {
-                "OpenStreetMap": 18,
-                "CartoDB Positron": 19,
-                "CartoDB Voyager": 19,
-                "ESRI World Imagery": 20,
-                "Stamen Terrain": 17
-            }
-            max_zoom = max_zoom_limits.get(map_type, 18)
+            max_zoom = _MAX_ZOOM_LIMITS.get(self.map_type_var.get(), 18)
             safe_zoom = min(zoom_level, max_zoom)  # Sin límite artificial; descarga bajo demanda
 
             # Guarda el nivel para otros usos
@@ -604,35 +1054,46 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         
         return west, south, east, north
     
-    def _lat_lon_to_web_mercator(self, lat, lon):
-        """Convertir lat/lon a Web Mercator (EPSG:3857)"""
-        import math
-        
-        x = lon * 20037508.34 / 180
-        y = math.log(math.tan((90 + lat) * math.pi / 360)) / (math.pi / 180)
-        y = y * 20037508.34 / 180
-        
+    @staticmethod
+    def _lat_lon_to_web_mercator(lat, lon):
+        """
+        Convertir lat/lon a Web Mercator (EPSG:3857).
+        Acepta escalares o arrays (conversión vectorizada de muchos puntos).
+        """
+        x = np.asarray(lon) * (_MERC_MAX / 180)
+        y = np.log(np.tan((90 + np.asarray(lat)) * (np.pi / 360))) * _EARTH_R
+
         return x, y
     
-    def _web_mercator_to_lat_lon(self, x, y):
-        """Convertir Web Mercator a lat/lon"""
-        import math
+    @classmethod
+    def _web_mercator_to_lat_lon(cls, x, y):
+        """
+        Convertir Web Mercator a lat/lon (fórmula cerrada, sin pyproj).
+        Escalares: sólo math, sin crear arrays (clics); arrays: vectorizado con NumPy.
+        """
+        if np.isscalar(x) and np.isscalar(y):
+            return _merc_y_to_lat(float(y)), float(x) * cls._MERC_TO_DEG
 
-        lon = x * 180 / 20037508.34
-        lat = math.atan(math.exp(y * math.pi / 20037508.34)) * 360 / math.pi - 90
+        lon = np.asarray(x) * cls._MERC_TO_DEG
+        lat = np.degrees(np.arctan(np.sinh(np.asarray(y) * cls._INV_MERC)))
 
         return lat, lon
 
+    @classmethod
+    def _lon_lat_coords_to_3857(cls, coords):
+        """Coordenadas (N, 2) lon/lat -> Web Mercator en una sola operación vectorizada"""
+        lat = np.clip(coords[:, 1], -cls._MERC_MAX_LAT, cls._MERC_MAX_LAT)
+        x, y = cls._lat_lon_to_web_mercator(lat, coords[:, 0])
+        return np.column_stack((x, y))
+
     def _format_lon(self, x, pos):
         """Formateador para eje X (longitud) - convierte Web Mercator a grados"""
-        lon = x * 180 / 20037508.34
-        return f"{lon:.2f}°"
+        return f"{x * self._MERC_TO_DEG:.2f}°"
 
     def _format_lat(self, y, pos):
         """Formateador para eje Y (latitud) - convierte Web Mercator a grados"""
-        import math
-        lat = math.atan(math.exp(y * math.pi / 20037508.34)) * 360 / math.pi - 90
-        return f"{lat:.2f}°"
+        # lat = gd(y) = atan(sinh(y·π/R)); equivale a 2·atan(exp(·)) - 90° y es más estable
+        return f"{_merc_y_to_lat(float(y)):.2f}°"
 
     def _setup_axes_formatters(self):
         """Aplicar formateadores de lat/lon a los ejes (reutilizable)"""
@@ -668,12 +1129,67 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             self._pan_x_per_px = (self._pan_xlim0[1] - self._pan_xlim0[0]) / bbox.width
             self._pan_y_per_px = (self._pan_ylim0[1] - self._pan_ylim0[0]) / bbox.height
 
-            if self._basemap_im is not None:
-                try:
-                    self._basemap_im.set_interpolation('nearest')
-                except Exception:
-                    pass
-            self._pan_fast_mode = True
+            # Camino más barato durante el pan: vecino más cercano, sin
+            # normalización del filtro (el remuestreo ya está desactivado)
+            self._set_basemap_interp('nearest')
+
+            # Blitting: capas de datos animadas y fondo del axes capturado una sola vez
+            self._start_pan_blit()
+
+    def _set_basemap_interp(self, interp):
+        """
+        Cambia la interpolación del mapa base sólo si es distinta de la actual:
+        cada set_interpolation/set_filternorm marca el artista como 'stale' y
+        fuerza un re-render AGG aunque el valor no cambie.
+        """
+        if self._basemap_im is None or interp == self._current_interp:
+            return
+        try:
+            self._basemap_im.set_interpolation(interp)
+            self._basemap_im.set_filternorm(interp != 'nearest')
+            self._current_interp = interp
+        except Exception:
+            pass
+
+    def _start_pan_blit(self):
+        """
+        Prepara el blitting del pan: marca las capas de datos como animadas,
+        pinta una vez el resto de la figura y guarda el fondo del axes.
+        """
+        try:
+            artists = self.ax.images + self.ax.collections + self.ax.lines + self.ax.patches
+            self._pan_artists = sorted(
+                (a for a in artists if a.get_visible()), key=lambda a: a.get_zorder()
+            )
+            for artist in self._pan_artists:
+                artist.set_animated(True)
+            self.canvas.draw()
+            self._pan_bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        except Exception as e:
+            print(f"⚠️ Blitting no disponible: {e}")
+            self._end_pan_blit()
+
+    def _blit_pan_frame(self):
+        """Repinta sólo las capas de datos sobre el fondo guardado (sin redibujar la figura)"""
+        if self._pan_bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._pan_bg)
+        for artist in self._pan_artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def _end_pan_blit(self):
+        """Restaura los artistas animados; retorna True si había un pan con blitting"""
+        was_blitting = self._pan_bg is not None
+        for artist in self._pan_artists:
+            try:
+                artist.set_animated(False)
+            except Exception:
+                pass
+        self._pan_artists = []
+        self._pan_bg = None
+        return was_blitting
 
     def _on_mouse_move(self, event):
         if event.inaxes != self.ax:
@@ -685,8 +1201,6 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 )
             return
         try:
-            import time
-            import math
             now_ms = int(time.perf_counter() * 1000)
 
             if self.is_panning and event.x is not None and event.y is not None:
@@ -717,9 +1231,8 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 new_ylim = (self._pan_ylim0[0] - dy_data,
                             self._pan_ylim0[1] - dy_data)
 
-                self.ax.set_xlim(new_xlim)
-                self.ax.set_ylim(new_ylim)
-                self.canvas.draw_idle()
+                self._set_view(new_xlim, new_ylim)
+                self._blit_pan_frame()
 
                 self._last_paint_ms = now_ms
                 return
@@ -747,12 +1260,11 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             moved_dist = getattr(self, '_moved_distance', 0)
             is_click = moved_dist < 5  # Menos de 5 píxeles = clic
 
-            if self._basemap_im is not None and self._pan_fast_mode:
-                try:
-                    self._basemap_im.set_interpolation('bilinear')
-                except Exception:
-                    pass
-            self._pan_fast_mode = False
+            self._set_basemap_interp('bilinear')
+
+            # Fin del blitting: un único repintado completo (ejes, ticks, capas)
+            if self._end_pan_blit():
+                self.canvas.draw_idle()
 
             if was_panning and not self.rectangle_draw_mode and not is_click:
                 self._schedule_redraw()
@@ -791,14 +1303,14 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             width = (xlim[1] - xlim[0]) / zoom_factor
             height = (ylim[1] - ylim[0]) / zoom_factor
 
-            self.ax.set_xlim(cx - width / 2, cx + width / 2)
-            self.ax.set_ylim(cy - height / 2, cy + height / 2)
+            self._set_view((cx - width / 2, cx + width / 2), (cy - height / 2, cy + height / 2))
 
             # Repintado rápido (sin pedir tiles aún)
             self.canvas.draw_idle()
 
-            # Programar recarga de tiles tras pausa breve
-            self._schedule_redraw()
+            # Programar recarga de tiles tras la ráfaga de scroll (un único temporizador:
+            # sólo el último evento de la ráfaga pide teselas)
+            self._schedule_redraw(delay=250)
 
         except Exception as e:
             print(f"Error en scroll: {e}")
@@ -813,15 +1325,11 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             if not (-90 <= lat <= 90 and -180 <= lon <= 180):
                 return
             
-            # Remover marcador anterior
-            if self.current_marker:
-                self.current_marker.remove()
-            
-            # Agregar nuevo marcador
-            self.current_marker = self.ax.plot(x, y, 'ro', markersize=10, markeredgecolor='white', markeredgewidth=2, zorder=5)[0]
-            
-            # Actualizar canvas
-            self.canvas.draw_idle()
+            # Mover el marcador (se reutiliza la misma Line2D)
+            self._place_marker(x, y)
+
+            # Actualizar sólo el marcador (la vista no cambió)
+            self._blit_marker()
             
             # Guardar coordenadas y notificar
             self._on_coordinate_selected(lat, lon)
@@ -837,7 +1345,6 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         try:
             xlim = self.ax.get_xlim()
             extent = xlim[1] - xlim[0]
-            import math
             new_zoom = int(max(1, min(18, math.log2(40000000 / extent))))
             self.zoom_level = new_zoom
         except:
@@ -845,12 +1352,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
     def _reload_tiles_if_needed(self):
         """Recargar tiles si es necesario para mejor calidad"""
+        # Solo recargar si no se está moviendo activamente y el proveedor responde
+        if self.is_panning or self._basemap_fail_count >= self._BASEMAP_MAX_FAILURES:
+            return
         try:
-            # Solo recargar si no se está moviendo activamente
-            if not self.is_panning:
-                self._create_map_overlay()
-        except:
-            pass
+            self._create_map_overlay()
+        except Exception as e:
+            print(f"⚠️ Error recargando teselas: {e}")
     
     def _on_coordinate_selected(self, lat, lon):
         """Callback cuando se seleccionan coordenadas"""
@@ -867,6 +1375,9 @@ class MatplotlibMapViewer(ctk.CTkFrame):
     
     def _change_map_type(self, map_type):
         """Cambiar tipo de mapa manteniendo la vista actual"""
+        self._tile_source_cached = _TILE_SOURCES.get(map_type, ctx.providers.OpenStreetMap.Mapnik)
+        # Otro proveedor: se vuelve a intentar aunque el anterior estuviera caído
+        self._basemap_fail_count = 0
         self.status_label.configure(text=f"🔄 {get_text('map_viewer.changing_to', 'Cambiando a')} {map_type}...", text_color=ThemeManager.COLORS['warning'])
 
         # Guardar los límites actuales de la vista
@@ -875,13 +1386,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
         # Guardar marcador actual si existe
         current_marker_coords = None
-        if self.current_marker:
+        if self.current_marker is not None and self.current_marker.get_visible():
             current_marker_coords = (self.selected_lat, self.selected_lon)
 
         print(f"🔄 Cambiando base map a {map_type}, manteniendo vista...")
 
         # Cambiar el mapa manteniendo la vista
-        self.after(100, lambda: self._change_map_preserving_view(current_xlim, current_ylim, current_marker_coords))
+        self.after(100, self._change_map_preserving_view, current_xlim, current_ylim, current_marker_coords)
 
     def _change_map_preserving_view(self, xlim, ylim, marker_coords):
         """
@@ -890,20 +1401,14 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         """
         try:
             # Actualizar sólo basemap
-            self.ax.set_xlim(xlim)
-            self.ax.set_ylim(ylim)
+            self._set_view(xlim, ylim)
             self._draw_basemap(xlim, ylim, force=True)
 
             # Restaurar marcador si existía
             if marker_coords and marker_coords[0] is not None and marker_coords[1] is not None:
                 lat, lon = marker_coords
                 x, y = self._lat_lon_to_web_mercator(lat, lon)
-                if self.current_marker:
-                    self.current_marker.remove()
-                self.current_marker = self.ax.plot(
-                    x, y, 'ro', markersize=10,
-                    markeredgecolor='white', markeredgewidth=2, zorder=5
-                )[0]
+                self._place_marker(x, y)
 
             self.canvas.draw_idle()
 
@@ -924,10 +1429,9 @@ class MatplotlibMapViewer(ctk.CTkFrame):
     def _reset_view(self):
         """Resetear vista del mapa - zoom inteligente a rasters o región por defecto"""
 
-        # Limpiar marcador
-        if self.current_marker:
-            self.current_marker.remove()
-            self.current_marker = None
+        # Ocultar marcador (se reutiliza en el próximo clic)
+        if self.current_marker is not None:
+            self.current_marker.set_visible(False)
 
         # Resetear coordenadas
         self.coords_label.configure(
@@ -961,6 +1465,8 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
     def _handle_reset_view(self):
         """Manejar clic en botón de reset - usa callback personalizado si existe"""
+        # Reset explícito del usuario: reintentar el mapa base
+        self._basemap_fail_count = 0
         if self.reset_callback:
             # Usar callback personalizado (ej: zoom a cuenca en ventana de delimitación)
             self.reset_callback()
@@ -1030,31 +1536,17 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             west, south, east, north = self._get_bounds_from_center(lat, lon, zoom_level)
 
             # Ajustar vista del axes (SIN clear - solo cambia qué área geográfica se muestra)
-            self.ax.set_xlim(west, east)
-            self.ax.set_ylim(south, north)
+            self._set_view((west, east), (south, north))
 
-            # Redibujar basemap con los nuevos límites
-            xlim = (west, east)
-            ylim = (south, north)
-            self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
+            # Basemap con los nuevos límites: diferido para agrupar llamadas seguidas
+            self._schedule_redraw(delay=100)
 
             # Agregar o actualizar marcador
             x, y = self._lat_lon_to_web_mercator(lat, lon)
-            if self.current_marker:
-                # Actualizar posición del marcador existente
-                self.current_marker.set_data([x], [y])
-            else:
-                # Crear nuevo marcador
-                self.current_marker = self.ax.plot(
-                    x, y, 'ro',
-                    markersize=10,
-                    markeredgecolor='white',
-                    markeredgewidth=2,
-                    zorder=5
-                )[0]
-
-            # Redibujar canvas
-            self.canvas.draw()
+            self._place_marker(x, y)
+
+            # Redibujar canvas (la vista cambió: repintado completo, no blitting)
+            self.canvas.draw_idle()
 
             # Notificar coordenadas
             self._on_coordinate_selected(lat, lon)
@@ -1062,18 +1554,144 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         except Exception as e:
             print(f"Error estableciendo coordenadas: {e}")
 
+    def _set_view(self, xlim, ylim):
+        """
+        Aplica los límites X e Y juntos, sin emitir xlim/ylim_changed por cada
+        eje (el repintado lo dispara quien llama).
+        """
+        self.ax.set_xlim(xlim, emit=False)
+        self.ax.set_ylim(ylim, emit=False)
+
+    def _place_marker(self, x, y):
+        """
+        Mueve el marcador a (x, y) en EPSG:3857 y lo muestra. La Line2D se crea
+        una sola vez; después sólo se actualizan sus datos (sin remove()+plot()).
+        """
+        marker = self.current_marker
+        if marker is None or marker.axes is not self.ax:
+            # Primera vez, o el marcador fue retirado del axes desde fuera
+            marker = self.ax.plot(
+                [x], [y], 'ro',
+                markersize=10,
+                markeredgecolor='white',
+                markeredgewidth=2,
+                zorder=5
+            )[0]
+            self.current_marker = marker
+        else:
+            marker.set_data([x], [y])
+            marker.set_visible(True)
+        return marker
+
+    def _place_temp_marker(self, x, y):
+        """
+        Muestra el punto temporal del rectángulo en (x, y). La Line2D se crea una
+        sola vez y se reutiliza entre rectángulos (set_data/set_visible).
+        """
+        marker = self.temp_marker
+        if marker is None or marker.axes is not self.ax:
+            marker = self.ax.plot(
+                [x], [y], 'bs',
+                markersize=8,
+                markeredgecolor='white',
+                markeredgewidth=2,
+                zorder=5
+            )[0]
+            self.temp_marker = marker
+        else:
+            marker.set_data([x], [y])
+            marker.set_visible(True)
+        return marker
+
+    def _temp_marker_visible(self):
+        """True si el punto temporal está en el mapa y visible"""
+        marker = self.temp_marker
+        return marker is not None and marker.axes is self.ax and marker.get_visible()
+
+    def _hide_temp_marker(self):
+        """Oculta el punto temporal; retorna True si estaba visible (hay que repintar)"""
+        if not self._temp_marker_visible():
+            return False
+        self.temp_marker.set_visible(False)
+        return True
+
+    def _on_canvas_draw(self, event):
+        """Cualquier repintado completo (basemap, rasters, pan, zoom) invalida el fondo del marcador"""
+        if not self._capturing_marker_bg:
+            self._marker_bg = None
+
+            # Modo rectángulo esperando el primer clic: lo recién pintado es justo
+            # el fondo sobre el que se bliteará el punto temporal
+            self._rect_bg = None
+            if self.rectangle_draw_mode and not self._temp_marker_visible():
+                try:
+                    self._rect_bg = self.canvas.copy_from_bbox(self.ax.bbox)
+                except Exception:
+                    pass
+
+    def _blit_marker(self):
+        """
+        Repinta sólo el marcador sobre el fondo guardado del axes. Si el fondo
+        no es válido, lo captura con un repintado completo sin el marcador.
+        """
+        marker = self.current_marker
+        if marker is None or not marker.get_visible():
+            self.canvas.draw_idle()
+            return
+        try:
+            if self._marker_bg is None:
+                self._capturing_marker_bg = True
+                try:
+                    marker.set_visible(False)
+                    self.canvas.draw()
+                    self._marker_bg = self.canvas.copy_from_bbox(self.ax.bbox)
+                finally:
+                    marker.set_visible(True)
+                    self._capturing_marker_bg = False
+
+            self.canvas.restore_region(self._marker_bg)
+            self.ax.draw_artist(marker)
+            self.canvas.blit(self.ax.bbox)
+        except Exception as e:
+            print(f"⚠️ Blitting del marcador no disponible: {e}")
+            self._marker_bg = None
+            self.canvas.draw_idle()
+
+    def _blit_temp_marker(self):
+        """
+        Pinta sólo el punto temporal del rectángulo sobre el fondo guardado, sin
+        re-rasterizar basemap, rasters ni shapefiles; repintado completo si no hay fondo.
+        """
+        background, self._rect_bg = self._rect_bg, None
+        if background is None:
+            self.canvas.draw_idle()
+            return
+        try:
+            self.canvas.restore_region(background)
+            self.ax.draw_artist(self.temp_marker)
+            self.canvas.blit(self.ax.bbox)
+        except Exception as e:
+            print(f"⚠️ Blitting del punto temporal no disponible: {e}")
+            self.canvas.draw_idle()
+
     def _force_basemap_refresh(self):
         """
         Fuerza redibujado del basemap con límites explícitos.
         Usado después de pan/zoom para garantizar que se descarguen tiles faltantes.
         """
+        # El temporizador ya se disparó: no queda nada pendiente que cancelar
+        self._reload_job = None
         try:
             # Obtener límites actuales explícitamente
             xlim = self.ax.get_xlim()
             ylim = self.ax.get_ylim()
 
-            # Redibujar basemap con límites explícitos y forzado
-            self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
+            # Redibujar basemap con límites explícitos (se omite si la vista no cambió)
+            self._draw_basemap(xlim=xlim, ylim=ylim)
+
+            # Releer rasters sólo en la ventana visible, a la resolución del canvas
+            self._refresh_rasters()
+            self._refresh_shapefiles()
             self.canvas.draw_idle()
         except Exception as e:
             print(f"⚠️ Error en _force_basemap_refresh: {e}")
@@ -1085,12 +1703,32 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         y mantiene la UI fluida durante pan/zoom.
         """
         try:
+            # La vista cambia: las precargas de la vista anterior ya no sirven
+            self._cancel_prefetch()
+
+            # Cada evento sólo mueve el plazo; el temporizador pendiente se
+            # reutiliza (Tkinter registra un comando Tcl nuevo por cada after())
+            now = time.perf_counter()
+            self._reload_due = now + delay / 1000
+            if self._reload_job is not None and self._reload_fire_at <= self._reload_due:
+                return
             if self._reload_job is not None:
+                # El nuevo plazo es anterior al del temporizador pendiente
                 self.after_cancel(self._reload_job)
-            self._reload_job = self.after(delay, self._force_basemap_refresh)
+            self._reload_fire_at = self._reload_due
+            self._reload_job = self.after(delay, self._on_reload_timer)
         except Exception:
             pass
 
+    def _on_reload_timer(self):
+        """Temporizador del debounce: refresca si venció el plazo o se reprograma por lo que falta"""
+        remaining_ms = int((self._reload_due - time.perf_counter()) * 1000)
+        if remaining_ms > 0:
+            self._reload_fire_at = self._reload_due
+            self._reload_job = self.after(remaining_ms, self._on_reload_timer)
+            return
+        self._force_basemap_refresh()
+
     def _show_error(self, message):
         """Mostrar mensaje de error"""
         self.status_label.configure(text=get_text("map_viewer.error", "❌ Error"), text_color=ThemeManager.COLORS['error'])
@@ -1114,26 +1752,410 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             if not hasattr(self, 'fig') or self.fig is None:
                 raise Exception("Mapa no inicializado")
 
-            # Asegurar que el directorio existe
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
             # Guardar con buena calidad y fondo transparente
-            self.fig.savefig(
-                filepath,
+            save_kwargs = dict(
                 dpi=150,
                 bbox_inches='tight',
                 facecolor='white',
                 edgecolor='none',
                 format='png'
             )
+            try:
+                self.fig.savefig(filepath, **save_kwargs)
+            except FileNotFoundError:
+                # Crear el directorio solo si no existe (evita un stat en cada guardado)
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                self.fig.savefig(filepath, **save_kwargs)
             return True
 
         except Exception as e:
             print(f"Error al guardar imagen del mapa: {str(e)}")
             return False
 
-    def add_raster_layer(self, raster_path, layer_name, alpha=0.7):
-        """Agregar capa raster al mapa"""
+    def _read_raster_window(self, src, view_bounds=None, max_size=None):
+        """
+        Lee la banda 1 de un raster abierto recortada a la vista y remuestreada
+        a la resolución del canvas (nunca más píxeles de los que se pueden ver).
+
+        Args:
+            src: Dataset de rasterio abierto
+            view_bounds: (xmin, ymin, xmax, ymax) en EPSG:3857, o None para toda la extensión
+            max_size: (ancho, alto) máximo de salida; None consulta el canvas (sólo hilo de Tk)
+
+        Returns:
+            (array float32 con NaN en nodata, [left, right, bottom, top] en EPSG:3857),
+            o None si la vista no intersecta el raster
+        """
+        from rasterio.enums import Resampling
+        from rasterio.windows import Window, from_bounds
+        from rasterio.windows import bounds as window_bounds
+
+        is_web_mercator = src.crs.to_string() == 'EPSG:3857'
+        full_window = Window(0, 0, src.width, src.height)
+
+        if view_bounds is None:
+            window = full_window
+        else:
+            # Llevar la vista (EPSG:3857) al CRS del raster
+            xmin, ymin, xmax, ymax = view_bounds
+            if not is_web_mercator:
+                xmin, ymin, xmax, ymax = self._project_bounds(
+                    xmin, ymin, xmax, ymax, 'EPSG:3857', src.crs
+                )
+            try:
+                window = from_bounds(xmin, ymin, xmax, ymax, transform=src.transform)
+                window = window.round_offsets(op='floor').round_lengths(op='ceil')
+                window = window.intersection(full_window)
+            except Exception:
+                # rasterio lanza WindowError si la vista no intersecta el raster
+                return None
+            if window.width < 1 or window.height < 1:
+                return None
+
+        # Resolución de salida: limitada a los píxeles del axes (con sobremuestreo)
+        if max_size is None:
+            max_size = self._get_raster_out_size()
+        out_w = max(1, min(int(window.width), max_size[0]))
+        out_h = max(1, min(int(window.height), max_size[1]))
+
+        # Usar masked=True para respetar valores nodata
+        raster_data = src.read(
+            1, window=window, out_shape=(out_h, out_w),
+            masked=True, resampling=Resampling.average
+        )
+
+        # Copia de visualización en float32: la mitad de bytes por redibujado
+        # que float64 y sin diferencia visible en el rango fijo 0-1
+        if raster_data.dtype == np.float64:
+            raster_data = raster_data.astype(np.float32, copy=False)
+
+        # Convertir masked array a array numpy con NaN para valores nodata
+        # Esto permite que matplotlib los trate como transparentes
+        if isinstance(raster_data, np.ma.MaskedArray):
+            raster_data = np.ma.filled(raster_data, np.nan)
+
+        # Extensión en Web Mercator de la ventana leída (envolvente de sus 4 esquinas).
+        # Los píxeles no se reproyectan: el imshow estira la imagen sobre esa extensión,
+        # lo que es exacto sólo si el CRS del raster no está rotado respecto a Web Mercator
+        left, bottom, right, top = window_bounds(window, src.transform)
+        if not is_web_mercator:
+            left, bottom, right, top = self._project_bounds(left, bottom, right, top, src.crs)
+
+        return raster_data, (left, right, bottom, top)
+
+    def _refresh_rasters(self):
+        """
+        Relee cada raster cargado sólo en la ventana visible, a la resolución
+        del canvas, y actualiza su imshow persistente (set_data/set_extent).
+        La lectura corre en _RASTER_IO_POOL; el resultado vuelve al hilo de Tk y se
+        descarta si mientras tanto se pidió otra vista.
+        """
+        if not hasattr(self, 'raster_layers') or not self.raster_layers:
+            return
+
+        try:
+            import rasterio
+        except ImportError:
+            return
+
+        xmin, xmax = self.ax.get_xlim()
+        ymin, ymax = self.ax.get_ylim()
+        view = (xmin, ymin, xmax, ymax)
+
+        # Ventana de lectura: la vista ampliada por el factor de sobremuestreo
+        pad_x = (xmax - xmin) * (self._RASTER_OVERSAMPLE - 1) / 2
+        pad_y = (ymax - ymin) * (self._RASTER_OVERSAMPLE - 1) / 2
+        read_bounds = (xmin - pad_x, ymin - pad_y, xmax + pad_x, ymax + pad_y)
+        max_size = self._get_raster_out_size()
+
+        self._raster_refresh_id += 1
+        refresh_id = self._raster_refresh_id
+        for layer_name in self.raster_layers:
+            source = self._raster_sources.get(layer_name)
+            if source is None or not self._raster_needs_resample(source, view):
+                continue
+            future = _RASTER_IO_POOL.submit(
+                self._read_raster_view_worker, source['path'], read_bounds, max_size
+            )
+            future.add_done_callback(
+                lambda f, name=layer_name, src=source: self._on_raster_refreshed(
+                    f, name, src, refresh_id, view
+                )
+            )
+
+    def _read_raster_view_worker(self, raster_path, read_bounds, max_size):
+        """
+        Lee la ventana de un raster para la vista (hilo de trabajo, sin Tk).
+        Retorna (códigos uint8, [left, right, bottom, top]) o None si queda fuera de la vista.
+        """
+        import rasterio
+
+        with rasterio.open(raster_path) as src:
+            result = self._read_raster_window(src, read_bounds, max_size)
+        if result is None:
+            return None
+        raster_data, extent = result
+        return self._quantize_raster(raster_data), list(extent)
+
+    def _on_raster_refreshed(self, future, layer_name, source, refresh_id, view):
+        """Callback del hilo de trabajo: enruta la relectura al hilo de Tk"""
+        try:
+            self.after(0, self._apply_raster_refresh, future, layer_name, source, refresh_id, view)
+        except Exception:
+            # El widget ya fue destruido
+            pass
+
+    def _apply_raster_refresh(self, future, layer_name, source, refresh_id, view):
+        """Actualiza el imshow de un raster releído (hilo de Tk); descarta vistas obsoletas"""
+        if refresh_id != self._raster_refresh_id:
+            return
+        raster_plot = getattr(self, 'raster_layers', {}).get(layer_name)
+        if raster_plot is None or self._raster_sources.get(layer_name) is not source:
+            # La capa se quitó (o se reemplazó) mientras se leía
+            return
+        try:
+            result = future.result()
+            if result is None:
+                # Fuera de la vista: no hay nada que releer
+                return
+            raster_data, extent = result
+            raster_plot.set_data(raster_data)
+            raster_plot.set_extent(extent)
+            source['read_view'] = view
+            source['read_extent'] = extent
+            self.canvas.draw_idle()
+        except Exception as e:
+            print(f"⚠️ Error releyendo raster {layer_name}: {e}")
+
+    def _raster_needs_resample(self, source, view):
+        """
+        True si hay que releer un raster (o recortar de nuevo un shapefile) para la
+        vista actual: el zoom cambió de forma apreciable o la parte visible se sale
+        de lo ya leído.
+        """
+        read_view = source.get('read_view')
+        read_extent = source.get('read_extent')
+        if read_view is None or read_extent is None:
+            return True
+
+        xmin, ymin, xmax, ymax = view
+        ratio = (xmax - xmin) / max(read_view[2] - read_view[0], 1e-9)
+        if ratio > self._RASTER_RESAMPLE_ZOOM or ratio < 1 / self._RASTER_RESAMPLE_ZOOM:
+            return True
+
+        # Parte visible del raster (intersección de la vista con su extensión completa)
+        left, right, bottom, top = source['extent']
+        vis_left, vis_right = max(xmin, left), min(xmax, right)
+        vis_bottom, vis_top = max(ymin, bottom), min(ymax, top)
+        if vis_left >= vis_right or vis_bottom >= vis_top:
+            # Raster fuera de la vista: nada que mostrar
+            return False
+
+        r_left, r_right, r_bottom, r_top = read_extent
+        return not (r_left <= vis_left and vis_right <= r_right and
+                    r_bottom <= vis_bottom and vis_top <= r_top)
+
+    def _recompute_raster_bounds(self):
+        """Recalcula la extensión conjunta de los rasters cargados (None si no hay)"""
+        extents = [
+            self._get_raster_full_extent(layer_name, raster_plot)
+            for layer_name, raster_plot in getattr(self, 'raster_layers', {}).items()
+        ]
+        if not extents:
+            self._raster_bounds_all = None
+            return
+        self._raster_bounds_all = [
+            min(e[0] for e in extents), max(e[1] for e in extents),
+            min(e[2] for e in extents), max(e[3] for e in extents),
+        ]
+
+    def _get_raster_full_extent(self, layer_name, raster_plot):
+        """Extensión completa [left, right, bottom, top] de una capa, aunque se muestre recortada"""
+        source = self._raster_sources.get(layer_name)
+        if source is not None:
+            return source['extent']
+        return raster_plot.get_extent()
+
+    def _project_bounds(self, left, bottom, right, top, src_crs, dst_crs='EPSG:3857'):
+        """
+        Envolvente (left, bottom, right, top) de un BBOX proyectado: las 4 esquinas
+        en una sola llamada (con CRS rotados, dos esquinas no bastan para cubrirlo)
+        """
+        xs, ys = self._project_xy(
+            [left, left, right, right], [bottom, top, bottom, top], src_crs, dst_crs
+        )
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _project_xy(self, xs, ys, src_crs, dst_crs='EPSG:3857'):
+        """
+        Proyecta coordenadas entre dos CRS. WGS84 <-> Web Mercator (el caso más
+        común) usa la fórmula cerrada; el resto, el Transformer cacheado de pyproj.
+        """
+        src_name = src_crs.to_string() if hasattr(src_crs, 'to_string') else str(src_crs)
+        dst_name = dst_crs.to_string() if hasattr(dst_crs, 'to_string') else str(dst_crs)
+
+        if src_name == dst_name:
+            return xs, ys
+        if src_name == 'EPSG:4326' and dst_name == 'EPSG:3857':
+            return self._lat_lon_to_web_mercator(ys, xs)
+        if src_name == 'EPSG:3857' and dst_name == 'EPSG:4326':
+            lat, lon = self._web_mercator_to_lat_lon(xs, ys)
+            return lon, lat
+        return self._get_transformer(src_crs, dst_crs).transform(xs, ys)
+
+    def _get_transformer(self, src_crs, dst_crs='EPSG:3857'):
+        """
+        Transformer de pyproj entre dos CRS, construido una sola vez por par
+        (construirlo cuesta mucho más que transformar unas pocas coordenadas).
+        Los Transformer son thread-safe desde pyproj 3.1.
+        """
+        from pyproj import Transformer
+
+        key = (str(src_crs.to_string() if hasattr(src_crs, 'to_string') else src_crs),
+               str(dst_crs.to_string() if hasattr(dst_crs, 'to_string') else dst_crs))
+        transformer = self._transformer_cache.get(key)
+        if transformer is None:
+            transformer = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+            self._transformer_cache[key] = transformer
+        return transformer
+
+    def _get_raster_out_size(self):
+        """
+        Tamaño (ancho, alto) de salida para leer rasters: píxeles del axes por el
+        factor de sobremuestreo; sólo desde el hilo de Tk
+        """
+        try:
+            bbox = self.ax.bbox
+            width, height = bbox.width, bbox.height
+        except Exception:
+            width, height = self._get_canvas_size()
+        return (max(1, int(width * self._RASTER_OVERSAMPLE)),
+                max(1, int(height * self._RASTER_OVERSAMPLE)))
+
+    def _get_canvas_size(self):
+        """Tamaño (ancho, alto) en píxeles del widget del canvas; sólo desde el hilo de Tk"""
+        widget = self.canvas.get_tk_widget()
+        return max(1, widget.winfo_width()), max(1, widget.winfo_height())
+
+    def _read_raster_worker(self, raster_path, max_size):
+        """
+        Lee un raster completo remuestreado a max_size (no toca Tk ni matplotlib,
+        puede correr en un hilo de trabajo).
+
+        Returns:
+            (códigos uint8 enmascarados en nodata, [left, right, bottom, top] en EPSG:3857)
+        """
+        import rasterio
+
+        with rasterio.open(raster_path) as src:
+            raster_data, extent = self._read_raster_window(src, max_size=max_size)
+
+        # Calcular y mostrar el rango real de valores para información
+        valid_data = raster_data[~np.isnan(raster_data)]
+        if len(valid_data) > 0:
+            print(f"✓ Rango real de valores: [{valid_data.min():.4f}, {valid_data.max():.4f}]")
+            print(f"  Rango visualización (fijo): [0, 1]")
+        else:
+            print("⚠️ No hay valores válidos en el raster")
+
+        return self._quantize_raster(raster_data), list(extent)
+
+    @classmethod
+    def _quantize_raster(cls, raster_data):
+        """
+        Cuantiza un raster de visualización (rango fijo 0-1, NaN en nodata) a
+        códigos uint8 0-255 enmascarados: un cuarto de los bytes de float32 en
+        cada redibujado. El colorbar sigue mostrando 0-1 (ver _add_raster_plot).
+        """
+        nodata = np.isnan(raster_data)
+        codes = np.clip(raster_data, 0, 1) * cls._RASTER_LEVELS
+        codes[nodata] = 0
+        codes = np.rint(codes, out=codes).astype(np.uint8)
+        return np.ma.masked_array(codes, mask=nodata)
+
+    def _add_raster_plot(self, raster_path, layer_name, raster_data, extent, alpha):
+        """
+        Crea el imshow de un raster ya leído (códigos uint8 de _quantize_raster)
+        y vincula el colorbar (hilo de Tk)
+        """
+        # Usar colormap seleccionado actualmente (nodata transparente, cacheado)
+        cmap = self._get_masked_colormap()
+
+        # Rango fijo 0-1 para todos los rasters (para comparabilidad), en códigos uint8
+        raster_plot = self.ax.imshow(
+            raster_data,
+            extent=extent,
+            alpha=alpha,
+            cmap=cmap,
+            interpolation='bilinear',
+            vmin=0,
+            vmax=self._RASTER_LEVELS,
+            zorder=10  # Asegurar que aparezca sobre el mapa base
+        )
+
+        # Guardar referencia para poder removerlo después
+        if not hasattr(self, 'raster_layers'):
+            self.raster_layers = {}
+
+        replacing = layer_name in self.raster_layers
+        self.raster_layers[layer_name] = raster_plot
+        # Ruta y extensión completa para relecturas por ventana al hacer pan/zoom
+        # (la lectura inicial cubre el raster completo: sirve de primera vista leída)
+        self._raster_sources[layer_name] = {
+            'path': raster_path,
+            'extent': list(extent),
+            'read_view': (extent[0], extent[2], extent[1], extent[3]),
+            'read_extent': list(extent),
+        }
+
+        # Extensión conjunta: unión incremental (recalcular si se reemplazó una capa)
+        bounds = self._raster_bounds_all
+        if replacing or bounds is None:
+            self._recompute_raster_bounds()
+        else:
+            self._raster_bounds_all = [
+                min(bounds[0], extent[0]), max(bounds[1], extent[1]),
+                min(bounds[2], extent[2]), max(bounds[3], extent[3]),
+            ]
+
+        # Crear colorbar solo la primera vez
+        # No se remueve ni recrea para evitar reducir el tamaño del mapa
+        try:
+            if not hasattr(self, 'raster_colorbar') or self.raster_colorbar is None:
+                # Crear colorbar solo si no existe; usa un mappable propio en el
+                # rango real 0-1 (los rasters se muestran como códigos uint8)
+                self._colorbar_mappable = ScalarMappable(norm=Normalize(0, 1), cmap=cmap)
+                self.raster_colorbar = self.fig.colorbar(
+                    self._colorbar_mappable,
+                    ax=self.ax,
+                    orientation='vertical',
+                    pad=0.02,
+                    shrink=0.7,
+                    label=get_text('sbn.priority_level')
+                )
+                print(f"✓ Colorbar creado")
+            else:
+                # Colorbar ya existe, actualizar al colormap del nuevo raster
+                self._colorbar_mappable.set_cmap(cmap)
+                self.raster_colorbar.update_normal(self._colorbar_mappable)
+                print(f"✓ Colorbar actualizado al nuevo raster con colormap: {cmap.name}")
+        except Exception as e:
+            print(f"⚠️ Error con colorbar: {e}")
+
+        return raster_plot
+
+    def add_raster_layer(self, raster_path, layer_name, alpha=0.7, callback=None):
+        """
+        Agregar capa raster al mapa. La lectura (rasterio) corre en un hilo de
+        trabajo; el imshow se crea después en el hilo de Tk.
+
+        Args:
+            callback: función opcional callback(success) llamada en el hilo de Tk
+                cuando la capa quedó en el mapa (o falló la lectura)
+
+        Returns:
+            bool: True si la lectura quedó en curso
+        """
         try:
             # Verificar que rasterio esté disponible
             try:
@@ -1149,112 +2171,78 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 print(f"Archivo raster no encontrado: {raster_path}")
                 return False
 
-            # Leer el raster
-            with rasterio.open(raster_path) as src:
-                # Leer los datos y la transformación
-                # Usar masked=True para respetar valores nodata
-                raster_data = src.read(1, masked=True)  # Leer la primera banda con máscara
-                transform = src.transform
-                crs = src.crs
-                nodata = src.nodata
-
-                # Convertir masked array a array numpy con NaN para valores nodata
-                # Esto permite que matplotlib los trate como transparentes
-                import numpy as np
-                if isinstance(raster_data, np.ma.MaskedArray):
-                    raster_data = np.ma.filled(raster_data, np.nan)
-
-                # Usar rango fijo 0-1 para todos los rasters (para comparabilidad)
-                vmin, vmax = 0, 1
-
-                # Calcular y mostrar el rango real de valores para información
-                valid_data = raster_data[~np.isnan(raster_data)]
-                if len(valid_data) > 0:
-                    actual_min = np.nanmin(raster_data)
-                    actual_max = np.nanmax(raster_data)
-                    print(f"✓ Rango real de valores: [{actual_min:.4f}, {actual_max:.4f}]")
-                    print(f"  Rango visualización (fijo): [{vmin}, {vmax}]")
-                else:
-                    print("⚠️ No hay valores válidos en el raster")
-
-                # Obtener las coordenadas de las esquinas
-                bounds = src.bounds
-
-                # Convertir bounds a Web Mercator si es necesario
-                if crs.to_string() != 'EPSG:3857':
-                    # Transformar coordenadas geográficas a Web Mercator
-                    from pyproj import Transformer
-                    transformer = Transformer.from_crs(crs, 'EPSG:3857', always_xy=True)
-                    left, bottom = transformer.transform(bounds.left, bounds.bottom)
-                    right, top = transformer.transform(bounds.right, bounds.top)
-                else:
-                    left, bottom, right, top = bounds.left, bounds.bottom, bounds.right, bounds.top
-
-                # Crear colormaps apropiados para visualización
-                import matplotlib.pyplot as plt
+            self.status_label.configure(
+                text=get_text("map_viewer.loading", "🔄 Cargando..."),
+                text_color=ThemeManager.COLORS['warning']
+            )
 
-                # Usar colormap seleccionado actualmente
-                cmap = self._get_colormap()
-                cmap.set_bad(alpha=0)  # Valores NaN (nodata) transparentes
+            # Leer el raster en segundo plano (el tamaño del axes se consulta aquí:
+            # los hilos de trabajo no pueden tocar Tk)
+            token = object()
+            self._raster_loads[layer_name] = token
+            future = _RASTER_IO_POOL.submit(
+                self._read_raster_worker, raster_path, self._get_raster_out_size()
+            )
+            future.add_done_callback(
+                lambda f: self._on_raster_read(f, raster_path, layer_name, alpha, token, callback)
+            )
+            return True
 
-                # Mostrar el raster en el mapa con rango fijo
-                raster_plot = self.ax.imshow(
-                    raster_data,
-                    extent=[left, right, bottom, top],
-                    alpha=alpha,
-                    cmap=cmap,
-                    interpolation='bilinear',
-                    vmin=vmin,  # Valor mínimo para el colorbar
-                    vmax=vmax,  # Valor máximo para el colorbar
-                    zorder=10  # Asegurar que aparezca sobre el mapa base
-                )
+        except Exception as e:
+            print(f"Error cargando raster {layer_name}: {str(e)}")
+            messagebox.showerror("Error", f"Error al cargar raster {layer_name}: {str(e)}")
+            return False
 
-                # Guardar referencia para poder removerlo después
-                if not hasattr(self, 'raster_layers'):
-                    self.raster_layers = {}
+    def _on_raster_read(self, future, raster_path, layer_name, alpha, token, callback):
+        """Callback del hilo de trabajo: enruta el raster leído al hilo de Tk"""
+        try:
+            self.after(0, self._install_raster, future, raster_path, layer_name, alpha, token, callback)
+        except Exception:
+            # El widget ya fue destruido
+            pass
 
-                self.raster_layers[layer_name] = raster_plot
+    def _install_raster(self, future, raster_path, layer_name, alpha, token, callback):
+        """Crea el imshow de un raster leído en segundo plano (hilo de Tk)"""
+        if self._raster_loads.get(layer_name) is not token:
+            # La capa se quitó (o se volvió a pedir) mientras se leía
+            return
+        del self._raster_loads[layer_name]
 
-                # Crear colorbar solo la primera vez
-                # No se remueve ni recrea para evitar reducir el tamaño del mapa
-                try:
-                    if not hasattr(self, 'raster_colorbar') or self.raster_colorbar is None:
-                        # Crear colorbar solo si no existe
-                        self.raster_colorbar = self.fig.colorbar(
-                            raster_plot,
-                            ax=self.ax,
-                            orientation='vertical',
-                            pad=0.02,
-                            shrink=0.7,
-                            label=get_text('sbn.priority_level')
-                        )
-                        print(f"✓ Colorbar creado")
-                    else:
-                        # Colorbar ya existe, actualizar para vincularlo al nuevo raster
-                        self.raster_colorbar.mappable = raster_plot
-                        self.raster_colorbar.update_normal(raster_plot)
-                        print(f"✓ Colorbar actualizado al nuevo raster con colormap: {cmap.name}")
-                except Exception as e:
-                    print(f"⚠️ Error con colorbar: {e}")
+        success = False
+        try:
+            raster_data, extent = future.result()
+            self._add_raster_plot(raster_path, layer_name, raster_data, extent, alpha)
 
-                # Actualizar el canvas
-                self.canvas.draw()
+            # Actualizar el canvas
+            self.canvas.draw_idle()
+            self.status_label.configure(
+                text=get_text("map_viewer.map_loaded", "✅ Mapa cargado"),
+                text_color=ThemeManager.COLORS['success']
+            )
 
-                print(f"Raster cargado: {layer_name}")
-                return True
+            print(f"Raster cargado: {layer_name}")
+            success = True
 
         except Exception as e:
             print(f"Error cargando raster {layer_name}: {str(e)}")
             messagebox.showerror("Error", f"Error al cargar raster {layer_name}: {str(e)}")
-            return False
+
+        if callback:
+            callback(success)
 
     def remove_raster_layer(self, layer_name):
         """Remover capa raster del mapa"""
         try:
+            # Anular una lectura en curso de esta capa
+            if self._raster_loads.pop(layer_name, None) is not None:
+                print(f"Carga de raster cancelada: {layer_name}")
+
             if hasattr(self, 'raster_layers') and layer_name in self.raster_layers:
                 # Remover el plot del matplotlib
                 self.raster_layers[layer_name].remove()
                 del self.raster_layers[layer_name]
+                self._raster_sources.pop(layer_name, None)
+                self._recompute_raster_bounds()
 
                 # Mantener colorbar visible siempre (no remover aunque no haya rasters)
                 # El colorbar permanece para indicar el último rango de valores
@@ -1262,7 +2250,7 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                     print(f"ℹ️ No quedan rasters, pero colorbar permanece visible")
 
                 # Actualizar el canvas
-                self.canvas.draw()
+                self.canvas.draw_idle()
 
                 print(f"Raster removido: {layer_name}")
                 return True
@@ -1288,6 +2276,172 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             print(f"Error limpiando rasters: {str(e)}")
             return False
 
+    def _load_vector_3857(self, vector_path):
+        """
+        Lee un vector reproyectado a EPSG:3857, reutilizando la lectura anterior
+        si el archivo no cambió (clave: ruta + fecha de modificación).
+        """
+        key = (os.path.abspath(vector_path), os.path.getmtime(vector_path))
+        gdf = self._vector_cache.get(key)
+        if gdf is not None:
+            self._vector_cache.move_to_end(key)
+            return gdf
+
+        gdf = gpd.read_file(vector_path)
+
+        # Reproyectar a Web Mercator si es necesario (todos los vértices de la capa
+        # en una sola transformación vectorizada)
+        epsg = gdf.crs.to_epsg() if gdf.crs else None
+        if len(gdf) > 0 and gdf.crs and epsg != 3857:
+            print(f"🔄 Reproyectando de {gdf.crs} a EPSG:3857")
+            import shapely
+
+            if epsg == 4326:
+                # WGS84: fórmula cerrada, sin pyproj
+                to_3857 = self._lon_lat_coords_to_3857
+            else:
+                # Otros CRS: Transformer reutilizado (gdf.to_crs crea uno por llamada)
+                transformer = self._get_transformer(gdf.crs)
+
+                def to_3857(coords):
+                    return np.column_stack(transformer.transform(coords[:, 0], coords[:, 1]))
+
+            geoms = shapely.transform(gdf.geometry.to_numpy(), to_3857)
+            gdf = gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index, crs='EPSG:3857'))
+
+        self._vector_cache[key] = gdf
+        while len(self._vector_cache) > self._vector_cache_max:
+            self._vector_cache.popitem(last=False)
+        return gdf
+
+    @staticmethod
+    def _geometry_paths(geom):
+        """
+        Paths de matplotlib de una geometría shapely: [(Path, es_polígono), ...].
+        Retorna None si la geometría no es de polígonos ni líneas.
+        """
+        if geom is None or geom.is_empty:
+            return []
+        geom_type = geom.geom_type
+        if geom_type == 'Polygon':
+            from shapely.geometry.polygon import orient
+
+            # Exterior antihorario y huecos horarios: los huecos quedan vacíos
+            # con la regla de relleno nonzero de Agg
+            geom = orient(geom, sign=1.0)
+            rings = [np.asarray(geom.exterior.coords)[:, :2]]
+            rings += [np.asarray(ring.coords)[:, :2] for ring in geom.interiors]
+            codes = []
+            for ring in rings:
+                ring_codes = np.full(len(ring), Path.LINETO, dtype=Path.code_type)
+                ring_codes[0] = Path.MOVETO
+                ring_codes[-1] = Path.CLOSEPOLY
+                codes.append(ring_codes)
+            return [(Path(np.concatenate(rings), np.concatenate(codes)), True)]
+        if geom_type == 'LineString' or geom_type == 'LinearRing':
+            return [(Path(np.asarray(geom.coords)[:, :2]), False)]
+        if geom_type.startswith('Multi') or geom_type == 'GeometryCollection':
+            paths = []
+            for part in geom.geoms:
+                part_paths = MatplotlibMapViewer._geometry_paths(part)
+                if part_paths is None:
+                    return None
+                paths.extend(part_paths)
+            return paths
+        return None
+
+    @staticmethod
+    def _polygon_paths(geometries):
+        """
+        Paths de matplotlib (uno por polígono) de un array de Polygon/MultiPolygon,
+        vectorizado con shapely 2: todas las coordenadas en un solo array y los
+        anillos orientados (exterior antihorario, huecos horarios) sin bucles
+        de Python por anillo ni por vértice.
+        """
+        import shapely
+
+        parts = shapely.get_parts(geometries)
+        parts = parts[~shapely.is_empty(parts)]
+        if len(parts) == 0:
+            return []
+
+        # Anillos de cada polígono (exterior primero) y sus vértices contiguos
+        rings, ring_part = shapely.get_rings(parts, return_index=True)
+        coords = shapely.get_coordinates(rings)
+        counts = shapely.get_num_coordinates(rings)
+        ends = np.cumsum(counts)
+        starts = ends - counts
+        ring_of = np.repeat(np.arange(len(rings)), counts)
+
+        # Doble del área con signo de cada anillo (shoelace), sin cruzar anillos
+        x, y = coords[:, 0], coords[:, 1]
+        cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+        cross[ring_of[:-1] != ring_of[1:]] = 0.0
+        area2 = np.add.reduceat(np.append(cross, 0.0), starts)
+        area2[counts == 0] = 0.0
+
+        # Invertir los anillos mal orientados con un único índice de reordenación
+        # (regla de relleno nonzero de Agg: los huecos deben ir al revés)
+        is_exterior = np.ones(len(rings), dtype=bool)
+        is_exterior[1:] = ring_part[1:] != ring_part[:-1]
+        flip = np.where(is_exterior, area2 < 0, area2 > 0)[ring_of]
+        index = np.arange(len(coords))
+        index[flip] = (starts + ends - 1)[ring_of][flip] - index[flip]
+        coords = coords[index]
+
+        codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+        codes[starts] = Path.MOVETO
+        codes[ends - 1] = Path.CLOSEPOLY
+
+        # Un Path por polígono: corte en el primer vértice de cada exterior
+        cuts = starts[is_exterior][1:]
+        return [Path(v, c) for v, c in zip(np.split(coords, cuts), np.split(codes, cuts))]
+
+    def _build_path_collection(self, geometries, facecolor, edgecolor, alpha, linewidth, zorder):
+        """
+        Una sola PathCollection con todas las geometrías de la capa (en lugar
+        de un parche por geometría como gdf.plot). 'geometries' es el array de
+        geometrías (gdf.geometry.values). Retorna None si la capa tiene
+        geometrías no soportadas (p. ej. puntos).
+        """
+        import shapely
+
+        # Capas sólo de polígonos (lo habitual): coordenadas en bloque, sin
+        # recorrer geometría por geometría
+        geometries = np.asarray(geometries)
+        if len(geometries) and np.isin(shapely.get_type_id(geometries), (3, 6)).all():
+            polygon_paths = self._polygon_paths(geometries)
+            if not polygon_paths:
+                return None
+            return PathCollection(
+                polygon_paths,
+                facecolors=facecolor,
+                edgecolors=edgecolor,
+                linewidths=linewidth,
+                alpha=alpha,
+                zorder=zorder
+            )
+
+        paths = []
+        for geom in geometries:
+            geom_paths = self._geometry_paths(geom)
+            if geom_paths is None:
+                return None
+            paths.extend(geom_paths)
+        if not paths:
+            return None
+
+        # Las líneas no se rellenan
+        facecolors = [facecolor if is_polygon else 'none' for _, is_polygon in paths]
+        return PathCollection(
+            [path for path, _ in paths],
+            facecolors=facecolors,
+            edgecolors=edgecolor,
+            linewidths=linewidth,
+            alpha=alpha,
+            zorder=zorder
+        )
+
     def add_vector_layer(self, vector_path, layer_name, color='blue', alpha=0.5, linewidth=2, edgecolor='darkblue'):
         """Agregar capa vectorial (shapefile) al mapa"""
         try:
@@ -1297,79 +2451,110 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 print(f"❌ Archivo vectorial no encontrado: {vector_path}")
                 return False
 
-            # Leer el shapefile con geopandas
-            gdf = gpd.read_file(vector_path)
+            # Leer el shapefile (ya en EPSG:3857; reutiliza la lectura de zoom_to_vector)
+            gdf = self._load_vector_3857(vector_path)
             print(f"✓ Shapefile leído: {len(gdf)} geometrías, CRS: {gdf.crs}")
 
             if len(gdf) == 0:
                 print("❌ Shapefile vacío")
                 return False
 
-            # Reproyectar a Web Mercator si es necesario
-            if gdf.crs and gdf.crs.to_string() != 'EPSG:3857':
-                print(f"🔄 Reproyectando de {gdf.crs} a EPSG:3857")
-                gdf = gdf.to_crs('EPSG:3857')
-                print(f"✓ Reproyección completa")
+            if not hasattr(self, 'vector_layers'):
+                self.vector_layers = {}
+
+            style = (color, edgecolor, alpha, linewidth)
+            layer = self.vector_layers.get(layer_name)
+            if layer is not None and layer['gdf'] is gdf and layer['style'] == style:
+                # Misma capa, mismo archivo y estilo: sólo reenganchar el artista
+                artist = layer['artist']
+                if artist is not None:
+                    if artist.axes is not self.ax:
+                        self.ax.add_collection(artist, autolim=False)
+                    artist.set_visible(True)
+                    print(f"✓ Capa ya construida, reutilizada: {layer_name}")
+                    self.canvas.draw_idle()
+                    return True
+
+            # Quitar la versión anterior de la capa (evita duplicados al recargar)
+            if layer is not None and layer['artist'] is not None:
+                try:
+                    layer['artist'].remove()
+                except Exception:
+                    pass
 
-            # Plotear en el mapa - gdf.plot() retorna el axes, no los objetos
             print(f"🎨 Ploteando en el mapa con color={color}, alpha={alpha}, edgecolor={edgecolor}")
-            gdf.plot(
-                ax=self.ax,
+            artist = self._build_path_collection(
+                gdf.geometry.values,
                 facecolor=color,
                 edgecolor=edgecolor,
                 alpha=alpha,
                 linewidth=linewidth,
                 zorder=15  # Por encima de los rasters
             )
+            if artist is not None:
+                # Una sola colección para toda la capa, sin autoescalar la vista
+                self.ax.add_collection(artist, autolim=False)
+            else:
+                # Puntos u otras geometrías: dibujo de geopandas
+                gdf.plot(
+                    ax=self.ax,
+                    facecolor=color,
+                    edgecolor=edgecolor,
+                    alpha=alpha,
+                    linewidth=linewidth,
+                    zorder=15
+                )
 
-            # Restaurar tamaño fijo del axes (gdf.plot puede modificarlo)
-            self.fig.subplots_adjust(left=0.08, right=0.95, bottom=0.08, top=0.95)
+                # Restaurar tamaño fijo del axes (gdf.plot puede modificarlo)
+                self.fig.subplots_adjust(left=0.08, right=0.95, bottom=0.08, top=0.95)
 
-            # Restaurar formateadores de lat/lon (gdf.plot puede alterarlos)
-            self._setup_axes_formatters()
+                # Restaurar formateadores de lat/lon (gdf.plot puede alterarlos)
+                self._setup_axes_formatters()
 
-            # Guardar referencia del GeoDataFrame
-            if not hasattr(self, 'vector_layers'):
-                self.vector_layers = {}
-
-            self.vector_layers[layer_name] = gdf
+            # Guardar el GeoDataFrame, su artista y el archivo del que salió
+            self.vector_layers[layer_name] = {
+                'gdf': gdf, 'artist': artist, 'style': style, 'path': vector_path,
+            }
 
             # Actualizar canvas
             print(f"🔄 Actualizando canvas...")
             self.canvas.draw_idle()
-            self.canvas.flush_events()
 
             print(f"✅ Vector cargado exitosamente: {layer_name}")
             return True
 
         except Exception as e:
             print(f"❌ Error cargando vector {layer_name}: {str(e)}")
-            import traceback
             traceback.print_exc()
             return False
 
-    def zoom_to_vector(self, vector_path, padding_factor=0.1):
-        """Hacer zoom a los bounds de un vector"""
+    def zoom_to_vector(self, vector_path, padding_factor=0.1, layer_name=None):
+        """
+        Hacer zoom a los bounds de un vector.
+        Si 'layer_name' ya está cargada (add_vector_layer) desde el mismo archivo,
+        usa su GeoDataFrame sin volver a abrirlo; si la capa viene de otro archivo
+        (p.ej. falló la carga del nuevo), se lee vector_path.
+        """
         try:
             print(f"🔍 zoom_to_vector iniciado: {vector_path}")
 
-            if not os.path.exists(vector_path):
-                print(f"❌ Archivo vectorial no encontrado: {vector_path}")
-                return False
+            layer = getattr(self, 'vector_layers', {}).get(layer_name) if layer_name is not None else None
+            if layer is not None and layer.get('path') == vector_path:
+                gdf = layer['gdf']
+                print(f"✓ Capa ya cargada para zoom: {layer_name} ({len(gdf)} geometrías)")
+            else:
+                if not os.path.exists(vector_path):
+                    print(f"❌ Archivo vectorial no encontrado: {vector_path}")
+                    return False
 
-            # Leer shapefile
-            gdf = gpd.read_file(vector_path)
-            print(f"✓ Shapefile leído para zoom: {len(gdf)} geometrías")
+                # Leer shapefile (ya en EPSG:3857)
+                gdf = self._load_vector_3857(vector_path)
+                print(f"✓ Shapefile leído para zoom: {len(gdf)} geometrías")
 
             if len(gdf) == 0:
                 print("❌ Shapefile vacío")
                 return False
 
-            # Reproyectar a Web Mercator si es necesario
-            if gdf.crs and gdf.crs.to_string() != 'EPSG:3857':
-                print(f"🔄 Reproyectando para zoom...")
-                gdf = gdf.to_crs('EPSG:3857')
-
             # Obtener bounds
             left, bottom, right, top = gdf.total_bounds
             print(f"📐 Bounds originales: left={left:.2f}, right={right:.2f}, bottom={bottom:.2f}, top={top:.2f}")
@@ -1406,21 +2591,14 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 f"📐 Bounds finales: left={padded_left:.2f}, right={padded_right:.2f}, bottom={padded_bottom:.2f}, top={padded_top:.2f}")
 
             # 1) pones los límites
-            self.ax.set_xlim(padded_left, padded_right)
-            self.ax.set_ylim(padded_bottom, padded_top)
-
-            # 2) 👇 aquí el cambio: pregunta cuáles quedaron DE VERDAD
-            final_xlim = self.ax.get_xlim()
-            final_ylim = self.ax.get_ylim()
+            self._set_view((padded_left, padded_right), (padded_bottom, padded_top))
 
-            # 3) dibuja el basemap con esos reales
-            print("🗺️ Redibujando basemap con límites finales del axes...")
-            self._draw_basemap(xlim=final_xlim, ylim=final_ylim, force=True)
-
-            # 4) refresca
+            # 2) refresca
             self.canvas.draw_idle()
 
-            # 5) programar refresh adicional para asegurar descarga de tiles
+            # 3) basemap diferido: _force_basemap_refresh lee los límites que
+            #    quedaron DE VERDAD en el axes (agrupa llamadas seguidas)
+            print("🗺️ Programando basemap con límites finales del axes...")
             self._schedule_redraw(delay=100)
 
             print(f"✅ Zoom aplicado a vector: {os.path.basename(vector_path)}")
@@ -1428,7 +2606,6 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
         except Exception as e:
             print(f"❌ Error haciendo zoom al vector: {str(e)}")
-            import traceback
             traceback.print_exc()
             return False
 
@@ -1453,19 +2630,12 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             new_ylim = (center_y - height / 2, center_y + height / 2)
 
             # Aplicar nuevos límites
-            self.ax.set_xlim(new_xlim)
-            self.ax.set_ylim(new_ylim)
-
-            # Obtener límites finales
-            final_xlim = self.ax.get_xlim()
-            final_ylim = self.ax.get_ylim()
+            self._set_view(new_xlim, new_ylim)
 
-            # Redibujar basemap
-            self._draw_basemap(xlim=final_xlim, ylim=final_ylim, force=True)
+            # Repintado rápido y una sola recarga de teselas al terminar la ráfaga
+            # de clics (clics seguidos reprograman el mismo temporizador)
             self.canvas.draw_idle()
-
-            # Programar refresh adicional para asegurar descarga de tiles
-            self._schedule_redraw(delay=100)
+            self._schedule_redraw(delay=250)
 
             print("🔍+ Zoom In aplicado")
             return True
@@ -1495,19 +2665,12 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             new_ylim = (center_y - height / 2, center_y + height / 2)
 
             # Aplicar nuevos límites
-            self.ax.set_xlim(new_xlim)
-            self.ax.set_ylim(new_ylim)
+            self._set_view(new_xlim, new_ylim)
 
-            # Obtener límites finales
-            final_xlim = self.ax.get_xlim()
-            final_ylim = self.ax.get_ylim()
-
-            # Redibujar basemap
-            self._draw_basemap(xlim=final_xlim, ylim=final_ylim, force=True)
+            # Repintado rápido y una sola recarga de teselas al terminar la ráfaga
+            # de clics (clics seguidos reprograman el mismo temporizador)
             self.canvas.draw_idle()
-
-            # Programar refresh adicional para asegurar descarga de tiles
-            self._schedule_redraw(delay=100)
+            self._schedule_redraw(delay=250)
 
             print("🔍- Zoom Out aplicado")
             return True
@@ -1532,10 +2695,9 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
                 # Convertir bounds a Web Mercator si es necesario
                 if crs.to_string() != 'EPSG:3857':
-                    from pyproj import Transformer
-                    transformer = Transformer.from_crs(crs, 'EPSG:3857', always_xy=True)
-                    left, bottom = transformer.transform(bounds.left, bounds.bottom)
-                    right, top = transformer.transform(bounds.right, bounds.top)
+                    left, bottom, right, top = self._project_bounds(
+                        bounds.left, bounds.bottom, bounds.right, bounds.top, crs
+                    )
                 else:
                     left, bottom, right, top = bounds.left, bounds.bottom, bounds.right, bounds.top
 
@@ -1552,18 +2714,12 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 padded_top = top + padding_y
 
                 # Establecer los límites del mapa
-                self.ax.set_xlim(padded_left, padded_right)
-                self.ax.set_ylim(padded_bottom, padded_top)
-
-                # Redibujar basemap con los nuevos límites
-                xlim = (padded_left, padded_right)
-                ylim = (padded_bottom, padded_top)
-                self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
+                self._set_view((padded_left, padded_right), (padded_bottom, padded_top))
 
                 # Actualizar el canvas
-                self.canvas.draw()
+                self.canvas.draw_idle()
 
-                # Programar refresh adicional para asegurar descarga de tiles
+                # Basemap con los nuevos límites, diferido (agrupa llamadas seguidas)
                 self._schedule_redraw(delay=200)
 
                 print(f"✅ Zoom aplicado a raster: {os.path.basename(raster_path)}")
@@ -1578,8 +2734,9 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         try:
             if hasattr(self, 'raster_layers') and layer_name in self.raster_layers:
                 # Obtener los bounds de la capa cargada
+                # (la imagen puede estar recortada a la vista; usar la extensión completa)
                 raster_plot = self.raster_layers[layer_name]
-                extent = raster_plot.get_extent()
+                extent = self._get_raster_full_extent(layer_name, raster_plot)
 
                 # extent es [left, right, bottom, top]
                 left, right, bottom, top = extent
@@ -1597,16 +2754,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 padded_bottom = bottom - padding_y
                 padded_top = top + padding_y
 
-                self.ax.set_xlim(padded_left, padded_right)
-                self.ax.set_ylim(padded_bottom, padded_top)
-
-                # Redibujar basemap con los nuevos límites
-                xlim = (padded_left, padded_right)
-                ylim = (padded_bottom, padded_top)
-                self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
+                self._set_view((padded_left, padded_right), (padded_bottom, padded_top))
 
                 # Actualizar el canvas
-                self.canvas.draw()
+                self.canvas.draw_idle()
+
+                # Basemap y relectura de rasters para la nueva vista, diferidos
+                self._schedule_redraw(delay=100)
 
                 print(f"✅ Zoom aplicado a capa: {layer_name}")
                 return True
@@ -1625,21 +2779,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 print("No hay rasters cargados para hacer zoom")
                 return False
 
-            # Obtener bounds de todos los rasters
-            all_extents = []
-            for layer_name, raster_plot in self.raster_layers.items():
-                extent = raster_plot.get_extent()
-                all_extents.append(extent)
-
-            if not all_extents:
+            # Bounds combinados, mantenidos al agregar/quitar capas
+            # (extent es [left, right, bottom, top])
+            if self._raster_bounds_all is None:
+                self._recompute_raster_bounds()
+            if self._raster_bounds_all is None:
                 return False
-
-            # Calcular bounds combinados
-            # extent es [left, right, bottom, top]
-            min_left = min(extent[0] for extent in all_extents)
-            max_right = max(extent[1] for extent in all_extents)
-            min_bottom = min(extent[2] for extent in all_extents)
-            max_top = max(extent[3] for extent in all_extents)
+            min_left, max_right, min_bottom, max_top = self._raster_bounds_all
 
             # Calcular padding
             width = max_right - min_left
@@ -1653,16 +2799,13 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             padded_bottom = min_bottom - padding_y
             padded_top = max_top + padding_y
 
-            self.ax.set_xlim(padded_left, padded_right)
-            self.ax.set_ylim(padded_bottom, padded_top)
-
-            # Redibujar basemap con los nuevos límites
-            xlim = (padded_left, padded_right)
-            ylim = (padded_bottom, padded_top)
-            self._draw_basemap(xlim=xlim, ylim=ylim, force=True)
+            self._set_view((padded_left, padded_right), (padded_bottom, padded_top))
 
             # Actualizar el canvas
-            self.canvas.draw()
+            self.canvas.draw_idle()
+
+            # Basemap y relectura de rasters para la nueva vista, diferidos
+            self._schedule_redraw(delay=100)
 
             print(f"✅ Zoom aplicado a todos los rasters ({len(self.raster_layers)} capas)")
             return True
@@ -1693,69 +2836,79 @@ class MatplotlibMapViewer(ctk.CTkFrame):
         self.rectangle_draw_mode = True
         self.point_selection_mode = False
         self.rectangle_callback = callback
-        self.rect_start_x = None
-        self.rect_start_y = None
+        self.rect_start = None
+
+        # Un repintado al entrar en el modo captura el fondo para el primer clic
+        self.canvas.draw_idle()
         print("✅ Modo dibujo de rectángulo activado - Haga 2 clics para definir el área")
 
     def disable_rectangle_draw(self):
         """Desactiva el modo de dibujo de rectángulo (pero mantiene el rectángulo dibujado visible)"""
         self.rectangle_draw_mode = False
         self.rectangle_callback = None
+        self._rect_bg = None
 
-        # Limpiar marcador temporal si existe
-        if self.temp_marker:
-            try:
-                self.temp_marker.remove()
-            except:
-                pass
-            self.temp_marker = None
+        # Ocultar marcador temporal si está visible (sólo entonces hay algo que repintar)
+        if self._hide_temp_marker():
+            self.canvas.draw_idle()
 
         # NO limpiar current_rectangle - debe permanecer visible hasta que el usuario
         # haga clic nuevamente en el botón "📐 Definir Área SbN"
 
-        self.canvas.draw_idle()
-
-        self.rect_start_x = None
-        self.rect_start_y = None
+        self.rect_start = None
         print("⭕ Modo dibujo de rectángulo desactivado (rectángulo permanece visible)")
 
     def clear_current_rectangle(self):
         """Limpia el rectángulo actual del mapa (sin desactivar el modo)"""
-        # Limpiar marcador temporal si existe
-        if self.temp_marker:
-            try:
-                self.temp_marker.remove()
-            except:
-                pass
-            self.temp_marker = None
+        # Ocultar marcador temporal si está visible
+        removed = self._hide_temp_marker()
 
-        # Limpiar rectángulo actual si existe
-        if self.current_rectangle:
-            try:
-                self.current_rectangle.remove()
-            except:
-                pass
-            self.current_rectangle = None
+        # Ocultar rectángulo actual si está visible (el parche se reutiliza)
+        rect = self.current_rectangle
+        if rect is not None and rect.axes is self.ax and rect.get_visible():
+            rect.set_visible(False)
+            removed = True
 
-        self.canvas.draw_idle()
+        # Repintar una sola vez, y sólo si se quitó algo
+        if removed:
+            self.canvas.draw_idle()
         print("🗑️ Rectángulo anterior limpiado")
 
+    def _place_rectangle(self, x, y, width, height):
+        """
+        Muestra el rectángulo del área en EPSG:3857. Hay un solo parche que se
+        reutiliza (set_bounds/set_visible): los rectángulos anteriores no se
+        acumulan en el axes ni en cada repintado.
+        """
+        rect = self.current_rectangle
+        if rect is None or rect.axes is not self.ax:
+            rect = Rectangle(
+                (x, y), width, height,
+                linewidth=2, edgecolor='blue', facecolor='blue',
+                alpha=0.3, zorder=4
+            )
+            self.ax.add_patch(rect)
+            self.current_rectangle = rect
+        else:
+            rect.set_bounds(x, y, width, height)
+            rect.set_visible(True)
+        return rect
+
     def _on_rectangle_click(self, x, y):
         """Maneja los clics para crear el rectángulo (2 clics necesarios)"""
         try:
-            if self.rect_start_x is None:
+            if self.rect_start is None:
                 # Primer clic - guardar punto inicial y dibujar marcador
-                self.rect_start_x = x
-                self.rect_start_y = y
+                self.rect_start = (x, y)
                 print(f"📍 Esquina 1 seleccionada - Haga clic en la esquina opuesta")
 
                 # Dibujar punto temporal (marcador azul)
-                self.temp_marker = self.ax.plot(x, y, 'bs', markersize=8, markeredgecolor='white', markeredgewidth=2, zorder=5)[0]
-                self.canvas.draw_idle()
+                self._place_temp_marker(x, y)
+                self._blit_temp_marker()
 
             else:
                 # Segundo clic - crear rectángulo inmediatamente
-                x1, y1 = self.rect_start_x, self.rect_start_y
+                x1, y1 = self.rect_start
                 x2, y2 = x, y
 
                 # Calcular bounds
@@ -1764,59 +2917,45 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 min_y = min(y1, y2)
                 max_y = max(y1, y2)
 
-                # Convertir a lat/lon
+                # Recortar al mundo Web Mercator en metros: la proyección ya no puede
+                # dar lat/lon fuera de rango. En Y se recorta sin avisar (±85.05°);
+                # en X, salirse del mundo (más de 1 m) invalida el rectángulo
+                clamped_min_x = max(-_MERC_MAX, min(_MERC_MAX, min_x))
+                clamped_max_x = max(-_MERC_MAX, min(_MERC_MAX, max_x))
+                valid = (abs(clamped_min_x - min_x) <= 1.0 and abs(clamped_max_x - max_x) <= 1.0)
+                min_x, max_x = clamped_min_x, clamped_max_x
+                min_y = max(-_MERC_MAX, min(_MERC_MAX, min_y))
+                max_y = max(-_MERC_MAX, min(_MERC_MAX, max_y))
+
+                # Convertir a lat/lon (fórmula cerrada escalar, sin arrays temporales)
                 south, west = self._web_mercator_to_lat_lon(min_x, min_y)
                 north, east = self._web_mercator_to_lat_lon(max_x, max_y)
 
-                # Validar coordenadas
-                if not (-90 <= south <= 90 and -90 <= north <= 90 and
-                        -180 <= west <= 180 and -180 <= east <= 180):
-                    messagebox.showerror("Error", "Coordenadas fuera de rango válido")
-                    self.rect_start_x = None
-                    self.rect_start_y = None
-                    # Limpiar marcador temporal
-                    if self.temp_marker:
-                        try:
-                            self.temp_marker.remove()
-                        except:
-                            pass
-                        self.temp_marker = None
-                        self.canvas.draw_idle()
-                    return
+                # Resetear para permitir nuevo rectángulo y quitar el marcador
+                # temporal (sin repintar todavía)
+                self.rect_start = None
+                self._hide_temp_marker()
 
-                # Guardar coordenadas
-                self.drawn_rectangle_coords = {
-                    'north': north,
-                    'south': south,
-                    'east': east,
-                    'west': west
-                }
-
-                # Limpiar marcador temporal
-                if self.temp_marker:
-                    try:
-                        self.temp_marker.remove()
-                    except:
-                        pass
-                    self.temp_marker = None
-
-                # Dibujar rectángulo permanente
-                from matplotlib.patches import Rectangle
-                width = max_x - min_x
-                height = max_y - min_y
-                self.current_rectangle = Rectangle(
-                    (min_x, min_y), width, height,
-                    linewidth=2, edgecolor='blue', facecolor='blue',
-                    alpha=0.3, zorder=4
-                )
-                self.ax.add_patch(self.current_rectangle)
+                if valid:
+                    # Guardar coordenadas
+                    self.drawn_rectangle_coords = {
+                        'north': north,
+                        'south': south,
+                        'east': east,
+                        'west': west
+                    }
+
+                    # Dibujar rectángulo permanente
+                    self._place_rectangle(min_x, min_y, max_x - min_x, max_y - min_y)
+
+                # Un solo repintado por clic (marcador quitado y/o rectángulo nuevo)
                 self.canvas.draw_idle()
 
-                print(f"✅ Rectángulo dibujado: N={north:.6f}, S={south:.6f}, E={east:.6f}, W={west:.6f}")
+                if not valid:
+                    messagebox.showerror("Error", "Coordenadas fuera de rango válido")
+                    return
 
-                # Resetear para permitir nuevo rectángulo
-                self.rect_start_x = None
-                self.rect_start_y = None
+                print(f"✅ Rectángulo dibujado: N={north:.6f}, S={south:.6f}, E={east:.6f}, W={west:.6f}")
 
                 # Llamar callback (esto guardará el shapefile y desactivará el modo)
                 if self.rectangle_callback:
@@ -1824,7 +2963,6 @@ class MatplotlibMapViewer(ctk.CTkFrame):
 
         except Exception as e:
             print(f"Error en clic de rectángulo: {str(e)}")
-            import traceback
             traceback.print_exc()
 
     def check_for_drawn_rectangle(self):
@@ -1839,6 +2977,68 @@ class MatplotlibMapViewer(ctk.CTkFrame):
             return True
         return False
 
+    def _draw_shapefile_view(self, source, view):
+        """
+        Dibuja una capa de shapefile recortada a la vista ampliada (índice STRtree)
+        y simplificada al tamaño de un píxel, como una sola colección.
+        """
+        import shapely
+
+        xmin, ymin, xmax, ymax = view
+        pad_x = (xmax - xmin) * (self._RASTER_OVERSAMPLE - 1) / 2
+        pad_y = (ymax - ymin) * (self._RASTER_OVERSAMPLE - 1) / 2
+        read_bounds = (xmin - pad_x, ymin - pad_y, xmax + pad_x, ymax + pad_y)
+
+        # Sólo las geometrías cuyo BBOX toca la vista (descarte en C con el índice)
+        index = np.sort(source['tree'].query(shapely.box(*read_bounds)))
+        visible = source['geometries'][index]
+
+        # Detalle por debajo de un píxel no se ve: menos vértices que dibujar
+        out_width = self._get_raster_out_size()[0] / self._RASTER_OVERSAMPLE
+        pixel_size = (xmax - xmin) / max(out_width, 1)
+        visible = shapely.simplify(visible, pixel_size, preserve_topology=False)
+
+        collection = self._build_path_collection(
+            visible, facecolor=source['color'], edgecolor=source['color'],
+            alpha=0.3, linewidth=2, zorder=4
+        )
+        self._remove_shapefile_artist(source)
+        if collection is not None:
+            self.ax.add_collection(collection)
+            self.shapefile_patches.append(collection)
+        source['artist'] = collection
+        source['read_view'] = view
+        source['read_extent'] = [read_bounds[0], read_bounds[2], read_bounds[1], read_bounds[3]]
+
+    def _remove_shapefile_artist(self, source):
+        """Quita del mapa la colección dibujada de una capa de shapefile"""
+        artist = source.get('artist')
+        if artist is None:
+            return
+        try:
+            artist.remove()
+        except Exception:
+            pass
+        if artist in self.shapefile_patches:
+            self.shapefile_patches.remove(artist)
+        source['artist'] = None
+
+    def _refresh_shapefiles(self):
+        """Vuelve a recortar las capas de shapefile si la vista salió de lo dibujado"""
+        if not self._shapefile_sources:
+            return
+
+        xmin, xmax = self.ax.get_xlim()
+        ymin, ymax = self.ax.get_ylim()
+        view = (xmin, ymin, xmax, ymax)
+        for layer_name, source in self._shapefile_sources.items():
+            if not self._raster_needs_resample(source, view):
+                continue
+            try:
+                self._draw_shapefile_view(source, view)
+            except Exception as e:
+                print(f"⚠️ Error recortando shapefile {layer_name}: {e}")
+
     def add_shapefile_layer(self, shp_path, layer_name="Shapefile", color='blue'):
         """
         Agrega un shapefile al mapa
@@ -1853,33 +3053,44 @@ class MatplotlibMapViewer(ctk.CTkFrame):
                 print("⚠️ Geopandas no disponible, no se puede cargar shapefile")
                 return
 
-            import geopandas as gpd
+            # Leer shapefile en Web Mercator (caché; sin reproyectar si ya lo está)
+            gdf = self._load_vector_3857(shp_path)
 
-            # Leer shapefile
-            gdf = gpd.read_file(shp_path)
+            # Filtro vectorizado por tipo sobre el array de geometrías, sin filas de pandas
+            import shapely
 
-            # Convertir a Web Mercator si no lo está
-            if gdf.crs and gdf.crs != 'EPSG:3857':
-                gdf = gdf.to_crs('EPSG:3857')
+            geometries = np.asarray(gdf.geometry.values)
+            type_ids = shapely.get_type_id(geometries)
+            polygons = geometries[np.isin(type_ids, (3, 6))]  # Polygon, MultiPolygon
+            if len(polygons) == 0:
+                print(f"⚠️ Shapefile '{layer_name}' sin polígonos")
+                return
 
-            # Dibujar geometrías
-            for idx, row in gdf.iterrows():
-                geom = row.geometry
-                if geom.geom_type == 'Polygon':
-                    x, y = geom.exterior.xy
-                    patch = self.ax.fill(x, y, color=color, alpha=0.3, edgecolor=color, linewidth=2, zorder=4)[0]
-                    self.shapefile_patches.append(patch)
+            # Reemplazar la capa anterior con el mismo nombre
+            previous = self._shapefile_sources.pop(layer_name, None)
+            if previous is not None:
+                self._remove_shapefile_artist(previous)
+
+            left, bottom, right, top = shapely.total_bounds(polygons)
+            source = {
+                'geometries': polygons,
+                'tree': shapely.STRtree(polygons),
+                'color': color,
+                'artist': None,
+                'extent': [left, right, bottom, top],
+                'read_view': None,
+                'read_extent': None,
+            }
+            self._shapefile_sources[layer_name] = source
 
-                elif geom.geom_type == 'MultiPolygon':
-                    for poly in geom.geoms:
-                        x, y = poly.exterior.xy
-                        patch = self.ax.fill(x, y, color=color, alpha=0.3, edgecolor=color, linewidth=2, zorder=4)[0]
-                        self.shapefile_patches.append(patch)
+            # Dibujar sólo lo visible (se recorta de nuevo al hacer pan/zoom)
+            xmin, xmax = self.ax.get_xlim()
+            ymin, ymax = self.ax.get_ylim()
+            self._draw_shapefile_view(source, (xmin, ymin, xmax, ymax))
 
             self.canvas.draw_idle()
             print(f"✅ Shapefile '{layer_name}' agregado al mapa")
 
         except Exception as e:
             print(f"Error al agregar shapefile: {str(e)}")
-            import traceback
             traceback.print_exc()
\ No newline at end of file
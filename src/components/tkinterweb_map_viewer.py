@@ -1,20 +1,211 @@
 import customtkinter as ctk
-import folium
 import tempfile
+import atexit
+import base64
+import contextlib
 import os
+import re
+from pathlib import Path
 from tkinter import messagebox
 from ..core.theme_manager import ThemeManager
+from ..utils.resource_path import get_resource_path
 
-try:
-    import tkinterweb
-    TKINTERWEB_AVAILABLE = True
-    print("tkinterweb disponible ✅")
-except ImportError:
-    TKINTERWEB_AVAILABLE = False
-    print("tkinterweb NO disponible ❌")
+# folium y tkinterweb se importan al crear el primer visor, no al arrancar la app
+_folium = None
+_tkinterweb = None
+TKINTERWEB_AVAILABLE = None  # se resuelve en _get_tkinterweb()
+
+
+def _get_folium():
+    """Módulo folium, importado una sola vez al generar el primer mapa"""
+    global _folium
+    if _folium is None:
+        import folium
+        _folium = folium
+    return _folium
+
+
+def _get_tkinterweb():
+    """Módulo tkinterweb (None si no está instalado), importado una sola vez"""
+    global _tkinterweb, TKINTERWEB_AVAILABLE
+    if TKINTERWEB_AVAILABLE is None:
+        try:
+            import tkinterweb
+            _tkinterweb = tkinterweb
+            TKINTERWEB_AVAILABLE = True
+            print("tkinterweb disponible ✅")
+        except ImportError:
+            TKINTERWEB_AVAILABLE = False
+            print("tkinterweb NO disponible ❌")
+    return _tkinterweb
+
+# Diagnóstico del visor (SBN_MAP_DEBUG=1): trazas de carga y _debug_web_frame
+_DEBUG = os.environ.get("SBN_MAP_DEBUG") == "1"
+
+# Archivo HTML de respaldo (sólo si load_html falla): uno por proceso, borrado al salir
+_MAP_HTML_PATH = os.path.join(tempfile.gettempdir(), f"sbn_map_{os.getpid()}.html")
+
+
+def _remove_map_html():
+    """Borra el HTML de respaldo del proceso (registrado con atexit)"""
+    try:
+        if os.path.exists(_MAP_HTML_PATH):
+            os.remove(_MAP_HTML_PATH)
+    except OSError:
+        pass
+
+
+atexit.register(_remove_map_html)
+
+# Vista inicial (centrada en América): la usan folium y resetMapView() en JS
+_MAP_CENTER = (10, -75)
+_MAP_ZOOM = 4
+
+# Capas base del mapa: (tiles, nombre, atribución); la primera es la activa
+_TILE_LAYERS = (
+    ('OpenStreetMap', 'Calles', None),
+    ('https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
+     'Satélite', 'Esri'),
+    ('https://server.arcgisonline.com/ArcGIS/rest/services/World_Topo_Map/MapServer/tile/{z}/{y}/{x}',
+     'Topográfico', 'Esri'),
+)
+
+# Hosts de teselas de la capa inicial (preconnect: DNS + TLS resueltos antes de
+# pedir la primera tesela); Esri sólo se contacta al cambiar de capa
+_TILE_HOSTS = (
+    'https://a.tile.openstreetmap.org',
+    'https://b.tile.openstreetmap.org',
+    'https://c.tile.openstreetmap.org',
+)
+
+
+def _icon_data_uri(filename, fallback_url):
+    """PNG de src/icons embebido como data URI (sin red); URL remota si no está"""
+    try:
+        with open(get_resource_path(os.path.join("icons", filename)), 'rb') as f:
+            return 'data:image/png;base64,' + base64.b64encode(f.read()).decode('ascii')
+    except OSError as e:
+        print(f"⚠️ Icono local {filename} no disponible, se usará {fallback_url}: {e}")
+        return fallback_url
+
+
+# Iconos del marcador de clic: embebidos para que el primer clic no espere la descarga
+_MARKER_ICON_URL = _icon_data_uri(
+    'marker-icon-red.png',
+    'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-red.png')
+_MARKER_SHADOW_URL = _icon_data_uri(
+    'marker-shadow.png',
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet/0.7.7/images/marker-shadow.png')
+
+_HEAD_HINTS = "\n".join(
+    [f'<link rel="preconnect" href="{host}" crossorigin>' for host in _TILE_HOSTS]
+    + [f'<link rel="prefetch" as="image" href="{url}">'
+       for url in (_MARKER_ICON_URL, _MARKER_SHADOW_URL) if not url.startswith('data:')]
+)
+
+# JavaScript para comunicación con Python (clic -> marcador + pyCoordsCallback;
+# sin puente, las coordenadas quedan en el título del documento)
+_CLICK_JS_SRC = """
+var map = window[Object.keys(window).find(key => key.startsWith('map_'))];
+var currentMarker = null;
+
+map.on('click', function(e) {
+    var lat = e.latlng.lat;
+    var lng = e.latlng.lng;
+
+    // Remover marcador anterior
+    if (currentMarker) {
+        map.removeLayer(currentMarker);
+    }
+
+    // Agregar nuevo marcador
+    currentMarker = L.marker([lat, lng], {
+        icon: L.icon({
+            iconUrl: '%(icon_url)s',
+            shadowUrl: '%(shadow_url)s',
+            iconSize: [25, 41],
+            iconAnchor: [12, 41],
+            popupAnchor: [1, -34],
+            shadowSize: [41, 41]
+        })
+    }).addTo(map);
+
+    // Popup con información
+    currentMarker.bindPopup(`
+        <div style="text-align: center;">
+            <b>Punto Seleccionado</b><br>
+            <strong>Lat:</strong> ${lat.toFixed(6)}<br>
+            <strong>Lon:</strong> ${lng.toFixed(6)}
+        </div>
+    `).openPopup();
+
+    // Enviar coordenadas a Python (objeto registrado con register_JS_object);
+    // si no hay puente, guardarlas en el título para el sondeo desde Python
+    try {
+        if (typeof pyCoordsCallback === 'function') {
+            pyCoordsCallback(lat, lng);
+        } else {
+            document.title = `COORDS:${lat.toFixed(6)},${lng.toFixed(6)}:${Date.now()}`;
+        }
+    } catch (e) {
+        console.log('Error enviando coordenadas:', e);
+    }
+
+    console.log('Coordenadas seleccionadas:', lat, lng);
+});
+
+// Función para resetear vista
+function resetMapView() {
+    map.setView([%(lat)s, %(lon)s], %(zoom)s);
+    if (currentMarker) {
+        map.removeLayer(currentMarker);
+        currentMarker = null;
+    }
+}
+
+console.log('Mapa interactivo listo');
+"""
+
+# Script (plantilla de folium) con las capas base para el control de capas: la
+# activa ya está en el mapa, las demás se crean sin agregarse; showLayerControl()
+# crea el control a demanda
+_LAYER_CONTROL_TEMPLATE = """
+{% macro script(this, kwargs) %}
+window.__baseLayers = {
+    {{ this.active_layer.layer_name|tojson }}: {{ this.active_layer.get_name() }},
+{%- for layer in this.lazy_layers %}
+    {{ layer.layer_name|tojson }}: L.tileLayer({{ layer.tiles|tojson }}, {{ layer.options|tojson }}),
+{%- endfor %}
+};
+window.showLayerControl = function () {
+    if (!window.__layerControl) {
+        window.__layerControl = L.control.layers(window.__baseLayers).addTo({{ this._parent.get_name() }});
+    }
+};
+{% endmacro %}
+"""
+
+
+def _minify(js):
+    """Minificado trivial: quita comentarios de línea completa y colapsa espacios"""
+    js = re.sub(r'^\s*//.*$', '', js, flags=re.MULTILINE)
+    return re.sub(r'\s+', ' ', js).strip()
+
+
+_CLICK_JS_MIN = '<script>' + _minify(_CLICK_JS_SRC % {
+    'icon_url': _MARKER_ICON_URL,
+    'shadow_url': _MARKER_SHADOW_URL,
+    'lat': _MAP_CENTER[0],
+    'lon': _MAP_CENTER[1],
+    'zoom': _MAP_ZOOM,
+}) + '</script>'
 
 class TkinterwebMapViewer(ctk.CTkFrame):
-    
+
+    # HTML del mapa generado por folium (el mapa base es estático): se genera una
+    # sola vez por proceso y se reutiliza en cada instancia
+    _MAP_HTML_CACHE = None
+
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
         
@@ -22,6 +213,21 @@ class TkinterwebMapViewer(ctk.CTkFrame):
         self.selected_lon = None
         self.coordinate_callback = None
         self.map_html_path = None
+
+        # Reposicionamiento del visor: un solo place() al final de cada ráfaga de
+        # <Configure> (debounce) y sólo si la geometría cambió
+        self._resize_after_id = None
+        self._container_geom = None
+
+        # Origen de la ventana principal en pantalla: se cachea y sólo se vuelve a
+        # consultar cuando la propia ventana recibe <Configure>
+        self._toplevel = self.winfo_toplevel()
+        self._top_root = None
+        self._toplevel.bind("<Configure>", self._on_toplevel_configure, add="+")
+
+        # Actualizaciones de etiquetas agrupadas (ver _batch_ui)
+        self._batch_depth = 0
+        self._pending_cfg = []
         
         self._setup_ui()
         self._create_map()
@@ -81,6 +287,17 @@ class TkinterwebMapViewer(ctk.CTkFrame):
         )
         manual_btn.pack(side="right", padx=5)
         
+        # Botón de capas (el control de capas se crea sólo al pedirlo)
+        layers_btn = ctk.CTkButton(
+            controls_frame,
+            text="🗺️",
+            width=40,
+            command=self._show_layer_control,
+            fg_color=ThemeManager.COLORS['accent_primary'],
+            hover_color=ThemeManager.COLORS['accent_secondary']
+        )
+        layers_btn.pack(side="right", padx=5)
+        
         # Botón de reset
         reset_btn = ctk.CTkButton(
             controls_frame,
@@ -103,7 +320,8 @@ class TkinterwebMapViewer(ctk.CTkFrame):
     def _create_web_viewer(self):
         """Crear visor web embebido usando tkinterweb"""
         
-        if not TKINTERWEB_AVAILABLE:
+        tkinterweb = _get_tkinterweb()
+        if tkinterweb is None:
             self._create_fallback_message()
             return
         
@@ -123,12 +341,13 @@ class TkinterwebMapViewer(ctk.CTkFrame):
             container_width = self.map_container.winfo_width() - 20
             container_height = self.map_container.winfo_height() - 20
             
-            self.tk_container.place(
+            self.tk_container.place_configure(
                 x=container_x, 
                 y=container_y, 
                 width=container_width, 
                 height=container_height
             )
+            self._container_geom = (container_x, container_y, container_width, container_height)
             
             # Crear tkinterweb dentro del contenedor
             self.web_frame = tkinterweb.HtmlFrame(
@@ -136,14 +355,25 @@ class TkinterwebMapViewer(ctk.CTkFrame):
                 messages_enabled=False
             )
             self.web_frame.pack(fill="both", expand=True)
+
+            # Puente JS -> Python: el clic en el mapa llama directamente a Python.
+            # tkinterweb lo implementa con pythonmonkey (opcional); sin él se
+            # vuelve a sondear el título del documento
+            try:
+                self.web_frame.configure(javascript_enabled=True)
+                self.web_frame.register_JS_object("pyCoordsCallback", self._on_js_coordinates)
+            except Exception as e:
+                print(f"⚠️ Puente JavaScript no disponible en tkinterweb ({e}); "
+                      f"se leerán los clics desde el título del documento")
+                self.after(2000, self._start_title_monitoring)
             
             # Configurar colores
             self.tk_container.configure(bg="#2B2B2B")
             
-            self.status_label.configure(text="✅ Visor embebido", text_color=ThemeManager.COLORS['success'])
+            self._configure_ui(self.status_label, text="✅ Visor embebido", text_color=ThemeManager.COLORS['success'])
             
-            # Actualizar posición cuando cambie el tamaño
-            self.bind("<Configure>", self._update_container_position)
+            # Actualizar posición cuando cambie el tamaño (agrupando la ráfaga de eventos)
+            self.bind("<Configure>", self._on_configure)
             
         except Exception as e:
             self._show_error(f"Error al crear visor embebido: {str(e)}")
@@ -165,176 +395,104 @@ class TkinterwebMapViewer(ctk.CTkFrame):
         self.status_label.configure(text="❌ Sin tkinterweb", text_color=ThemeManager.COLORS['error'])
     
     def _create_map(self):
-        """Crear mapa HTML con Folium"""
-        try:
-            # Crear mapa centrado en América
-            folium_map = folium.Map(
-                location=[10, -75],
-                zoom_start=4,
-                tiles=None
-            )
-            
-            # Capas base
-            folium.TileLayer(
-                'OpenStreetMap',
-                name='Calles',
-                overlay=False,
-                control=True
-            ).add_to(folium_map)
-            
-            folium.TileLayer(
-                'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-                attr='Esri',
-                name='Satélite',
-                overlay=False,
-                control=True
-            ).add_to(folium_map)
-            
+        """Crear mapa HTML con Folium (o reutilizar el ya generado)"""
+        with self._batch_ui():
+            try:
+                if TkinterwebMapViewer._MAP_HTML_CACHE is None:
+                    TkinterwebMapViewer._MAP_HTML_CACHE = self._build_map_html()
+                self._save_and_load_map(TkinterwebMapViewer._MAP_HTML_CACHE)
+            except Exception as e:
+                self._show_error(f"Error al crear mapa: {str(e)}")
+
+    def _build_map_html(self):
+        """Genera con folium el HTML del mapa (plantillas Jinja: costoso, una vez)"""
+        folium = _get_folium()
+        from branca.element import MacroElement
+        from jinja2 import Template
+
+        # Crear mapa centrado en América
+        folium_map = folium.Map(
+            location=list(_MAP_CENTER),
+            zoom_start=_MAP_ZOOM,
+            tiles=None
+        )
+        
+        # Capas base: sólo la primera se agrega al mapa; las demás se definen en
+        # JS sin agregarlas (no piden teselas hasta elegirlas en el control)
+        tile_layers = [
             folium.TileLayer(
-                'https://server.arcgisonline.com/ArcGIS/rest/services/World_Topo_Map/MapServer/tile/{z}/{y}/{x}',
-                attr='Esri',
-                name='Topográfico',
+                tiles,
+                name=name,
+                attr=attr,
                 overlay=False,
                 control=True
-            ).add_to(folium_map)
-            
-            # Control de capas
-            folium.LayerControl().add_to(folium_map)
-            
-            # JavaScript para comunicación con Python
-            click_js = """
-            <script>
-            var map = window[Object.keys(window).find(key => key.startsWith('map_'))];
-            var currentMarker = null;
-            
-            map.on('click', function(e) {
-                var lat = e.latlng.lat;
-                var lng = e.latlng.lng;
-                
-                // Remover marcador anterior
-                if (currentMarker) {
-                    map.removeLayer(currentMarker);
-                }
-                
-                // Agregar nuevo marcador
-                currentMarker = L.marker([lat, lng], {
-                    icon: L.icon({
-                        iconUrl: 'https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-red.png',
-                        shadowUrl: 'https://cdnjs.cloudflare.com/ajax/libs/leaflet/0.7.7/images/marker-shadow.png',
-                        iconSize: [25, 41],
-                        iconAnchor: [12, 41],
-                        popupAnchor: [1, -34],
-                        shadowSize: [41, 41]
-                    })
-                }).addTo(map);
-                
-                // Popup con información
-                currentMarker.bindPopup(`
-                    <div style="text-align: center;">
-                        <b>Punto Seleccionado</b><br>
-                        <strong>Lat:</strong> ${lat.toFixed(6)}<br>
-                        <strong>Lon:</strong> ${lng.toFixed(6)}
-                    </div>
-                `).openPopup();
-                
-                // Guardar coordenadas en el título de la página para comunicación
-                try {
-                    // Método simple: usar título de documento
-                    document.title = `COORDS:${lat.toFixed(6)},${lng.toFixed(6)}:${Date.now()}`;
-                    
-                    // También guardar en variable global
-                    window.selectedCoordinates = {lat: lat, lng: lng, timestamp: Date.now()};
-                    
-                } catch (e) {
-                    console.log('Error guardando coordenadas:', e);
-                }
-                
-                console.log('Coordenadas seleccionadas:', lat, lng);
-            });
-            
-            // Función para resetear vista
-            function resetMapView() {
-                map.setView([10, -75], 4);
-                if (currentMarker) {
-                    map.removeLayer(currentMarker);
-                    currentMarker = null;
-                }
-            }
-            
-            console.log('Mapa interactivo listo');
-            </script>
-            """
-            
-            # Agregar JavaScript al mapa
-            folium_map.get_root().html.add_child(folium.Element(click_js))
-            
-            # Guardar mapa en archivo temporal
-            self._save_and_load_map(folium_map)
-            
-        except Exception as e:
-            self._show_error(f"Error al crear mapa: {str(e)}")
+            )
+            for tiles, name, attr in _TILE_LAYERS
+        ]
+        tile_layers[0].add_to(folium_map)
+
+        # Control de capas diferido: se crea con el botón 🗺️
+        layer_control = MacroElement()
+        layer_control._template = Template(_LAYER_CONTROL_TEMPLATE)
+        layer_control.active_layer = tile_layers[0]
+        layer_control.lazy_layers = tile_layers[1:]
+        layer_control.add_to(folium_map)
+
+        # Agregar JavaScript al mapa (ya minificado)
+        folium_map.get_root().html.add_child(folium.Element(_CLICK_JS_MIN))
+
+        # Pistas de carga en <head>: preconnect a los hosts de teselas y prefetch
+        # de los iconos del marcador (la capa base activa se carga normalmente)
+        folium_map.get_root().header.add_child(folium.Element(_HEAD_HINTS))
+
+        return folium_map.get_root().render()
     
-    def _save_and_load_map(self, folium_map):
-        """Guardar mapa y cargarlo en tkinterweb"""
+    def _save_and_load_map(self, html):
+        """Cargar el HTML del mapa en tkinterweb (desde memoria; a disco sólo si falla)"""
         try:
-            # Crear archivo temporal
-            if self.map_html_path and os.path.exists(self.map_html_path):
-                os.remove(self.map_html_path)
-            
-            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8')
-            self.map_html_path = temp_file.name
-            
-            # Guardar mapa
-            folium_map.save(self.map_html_path)
-            temp_file.close()
-            
-            # Cargar en tkinterweb
             if hasattr(self, 'web_frame'):
-                print(f"Cargando archivo HTML: {self.map_html_path}")
-                print(f"Archivo existe: {os.path.exists(self.map_html_path)}")
-                
-                # Método 1: Cargar archivo HTML
+                # Método 1: HTML ya en memoria, sin escribir ni releer un archivo
                 try:
-                    self.web_frame.load_file(self.map_html_path)
-                    print("Mapa cargado con load_file()")
+                    self._load_html(html)
+                    if _DEBUG:
+                        print("Mapa cargado con load_html()")
                 except Exception as e:
-                    print(f"Error con load_file: {e}")
-                    
-                    # Método 2: Cargar HTML directamente
+                    print(f"Error con load_html: {e}")
+
+                    # Método 2: Guardar en archivo temporal y cargarlo
                     try:
-                        with open(self.map_html_path, 'r', encoding='utf-8') as f:
-                            html_content = f.read()
-                        self.web_frame.load_html(html_content)
-                        print("Mapa cargado con load_html()")
+                        # Ruta fija por proceso: se sobrescribe en lugar de crear/borrar
+                        self.map_html_path = _MAP_HTML_PATH
+                        with open(self.map_html_path, 'w', encoding='utf-8') as f:
+                            f.write(html)
+
+                        if _DEBUG:
+                            print(f"Cargando archivo HTML: {self.map_html_path}")
+                        self.web_frame.load_file(self.map_html_path)
+                        if _DEBUG:
+                            print("Mapa cargado con load_file()")
                     except Exception as e2:
-                        print(f"Error con load_html: {e2}")
+                        print(f"Error con load_file: {e2}")
                         raise e
                 
-                # Actualizar estado
-                self.status_label.configure(text="✅ Mapa cargado", text_color=ThemeManager.COLORS['success'])
-                
-                # Forzar actualización y reposicionar
-                self.web_frame.update()
-                self.update()
+                # Actualizar estado (el redibujado se hace una vez al cerrar el lote)
+                with self._batch_ui():
+                    self._configure_ui(self.status_label, text="✅ Mapa cargado", text_color=ThemeManager.COLORS['success'])
                 self.after(100, self._update_container_position)
                 
-                # Iniciar monitoreo simple del título
-                self.after(5000, self._start_title_monitoring)
-                
-                # Debug: verificar si se cargó
-                self.after(2000, self._debug_web_frame)
+                # Debug: verificar si se cargó (sólo con SBN_MAP_DEBUG=1)
+                if _DEBUG:
+                    self.after(2000, self._debug_web_frame)
             
         except Exception as e:
             self._show_error(f"Error al cargar mapa: {str(e)}")
     
     def _start_title_monitoring(self):
-        """Monitorear el título del documento para obtener coordenadas"""
+        """Monitorear el título del documento para obtener coordenadas (sin puente JS)"""
         try:
             if hasattr(self, 'web_frame'):
-                # Intentar obtener el título del navegador embebido
-                # Esto es un método simple y compatible
                 current_title = getattr(self.web_frame, 'title', '') or ''
-                
+
                 if current_title.startswith('COORDS:'):
                     # Parsear coordenadas del título
                     coords_part = current_title.replace('COORDS:', '').split(':')[0]
@@ -343,18 +501,25 @@ class TkinterwebMapViewer(ctk.CTkFrame):
                         try:
                             lat = float(lat_str)
                             lon = float(lon_str)
-                            
+
                             # Verificar si son coordenadas nuevas
                             if (self.selected_lat != lat or self.selected_lon != lon):
                                 self._on_coordinate_selected(lat, lon)
                         except ValueError:
                             pass
-                            
+
         except Exception as e:
             pass  # Silenciar errores del título
-            
+
         # Continuar monitoreando cada 2 segundos
         self.after(2000, self._start_title_monitoring)
+
+    def _on_js_coordinates(self, lat, lng):
+        """Llamado desde JavaScript al hacer clic en el mapa; se pasa al hilo de Tk"""
+        try:
+            self.after(0, self._on_coordinate_selected, float(lat), float(lng))
+        except Exception as e:
+            print(f"Error recibiendo coordenadas del mapa: {e}")
     
     def _debug_web_frame(self):
         """Debug: verificar estado del web frame"""
@@ -398,10 +563,12 @@ class TkinterwebMapViewer(ctk.CTkFrame):
         self.selected_lat = lat
         self.selected_lon = lon
         
-        self.coords_label.configure(
-            text=f"📍 Lat: {lat:.6f}, Lon: {lon:.6f}",
-            text_color=ThemeManager.COLORS['success']
-        )
+        with self._batch_ui():
+            self._configure_ui(
+                self.coords_label,
+                text=f"📍 Lat: {lat:.6f}, Lon: {lon:.6f}",
+                text_color=ThemeManager.COLORS['success']
+            )
         
         if self.coordinate_callback:
             self.coordinate_callback(lat, lon)
@@ -409,23 +576,75 @@ class TkinterwebMapViewer(ctk.CTkFrame):
     def _reset_view(self):
         """Resetear vista del mapa"""
         # Resetear coordenadas locales
-        self.coords_label.configure(
+        self._configure_ui(
+            self.coords_label,
             text="📍 Haga clic en el mapa",
             text_color=ThemeManager.COLORS['text_secondary']
         )
         self.selected_lat = None
         self.selected_lon = None
         
-        # Recargar el mapa para resetear vista
-        if hasattr(self, 'web_frame') and self.map_html_path:
+        # Resetear la vista con la función JS ya incluida en el mapa; recargar
+        # el documento completo sólo si el visor no puede ejecutar JavaScript
+        if hasattr(self, 'web_frame') and not self._run_js("resetMapView();"):
             try:
-                self.web_frame.load_file(self.map_html_path)
+                if self.map_html_path:
+                    self.web_frame.load_file(self.map_html_path)
+                elif TkinterwebMapViewer._MAP_HTML_CACHE is not None:
+                    self._load_html(TkinterwebMapViewer._MAP_HTML_CACHE)
             except Exception as e:
                 print(f"Error al resetear vista: {e}")
+
+    def _show_layer_control(self):
+        """Mostrar el control de capas base (creado a demanda en el mapa)"""
+        if hasattr(self, 'web_frame'):
+            self._run_js("showLayerControl();")
+
+    def _load_html(self, html):
+        """Carga HTML desde memoria; base_url permite resolver rutas relativas"""
+        base_url = Path(tempfile.gettempdir()).as_uri() + "/"
+        self.web_frame.load_html(html, base_url=base_url)
+
+    def _run_js(self, script):
+        """Ejecuta JavaScript en el mapa; retorna False si el visor no lo soporta"""
+        run_javascript = getattr(getattr(self, 'web_frame', None), 'run_javascript', None)
+        if run_javascript is None:
+            return False
+        try:
+            run_javascript(script)
+            return True
+        except Exception as e:
+            print(f"⚠️ JavaScript no disponible en el visor: {e}")
+            return False
     
+    @contextlib.contextmanager
+    def _batch_ui(self):
+        """Agrupa los configure() de etiquetas (reentrante): se aplican todos juntos
+        y se hace un solo update_idletasks al salir del bloque más externo"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                pending, self._pending_cfg = self._pending_cfg, []
+                try:
+                    for widget, kwargs in pending:
+                        widget.configure(**kwargs)
+                    self.update_idletasks()
+                except Exception as e:
+                    print(f"Error actualizando la interfaz: {e}")
+
+    def _configure_ui(self, widget, **kwargs):
+        """configure() diferido si hay un lote abierto; inmediato si no"""
+        if self._batch_depth:
+            self._pending_cfg.append((widget, kwargs))
+        else:
+            widget.configure(**kwargs)
+
     def _show_error(self, message):
         """Mostrar mensaje de error"""
-        self.status_label.configure(text="❌ Error", text_color=ThemeManager.COLORS['error'])
+        self._configure_ui(self.status_label, text="❌ Error", text_color=ThemeManager.COLORS['error'])
         print(f"MapViewer Error: {message}")
     
     def set_coordinate_callback(self, callback):
@@ -473,19 +692,40 @@ class TkinterwebMapViewer(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror("Error", f"Error al ingresar coordenadas: {str(e)}")
     
+    def _on_configure(self, event=None):
+        """<Configure> llega decenas de veces por redimensión: sólo se aplica el último"""
+        if self._resize_after_id is not None:
+            self.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.after(50, self._update_container_position)
+
+    def _on_toplevel_configure(self, event):
+        """La ventana se movió o cambió de tamaño: invalidar su origen cacheado"""
+        # <Configure> de la ventana también llega por cada hijo (bindtags)
+        if event.widget is self._toplevel:
+            self._top_root = None
+
     def _update_container_position(self, event=None):
         """Actualizar posición del contenedor tkinter"""
+        self._resize_after_id = None
         try:
             if hasattr(self, 'tk_container') and hasattr(self, 'map_container'):
-                # Obtener coordenadas actuales del contenedor
-                self.map_container.update_idletasks()
-                
-                container_x = self.map_container.winfo_rootx() - self.winfo_toplevel().winfo_rootx() + 10
-                container_y = self.map_container.winfo_rooty() - self.winfo_toplevel().winfo_rooty() + 10
+                # Obtener coordenadas actuales del contenedor (se llega siempre vía
+                # after(), con la geometría ya calculada: no hace falta otro flush)
+                if self._top_root is None:
+                    self._top_root = (self._toplevel.winfo_rootx(), self._toplevel.winfo_rooty())
+                top_x, top_y = self._top_root
+
+                container_x = self.map_container.winfo_rootx() - top_x + 10
+                container_y = self.map_container.winfo_rooty() - top_y + 10
                 container_width = max(self.map_container.winfo_width() - 20, 100)
                 container_height = max(self.map_container.winfo_height() - 20, 100)
+
+                geom = (container_x, container_y, container_width, container_height)
+                if geom == self._container_geom:
+                    return
+                self._container_geom = geom
                 
-                self.tk_container.place(
+                self.tk_container.place_configure(
                     x=container_x,
                     y=container_y,
                     width=container_width,
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 # Delimitación de cuenca: procesamiento en disco con remuestreo de FlowAccum a la malla de FlowDir
+import math
 import os
-from collections import OrderedDict, deque
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Dict
 
 import numpy as np
@@ -49,8 +51,9 @@ def calculate_pixel_area_geographic_from_ds(ds) -> float:
 
 # ======================= Infraestructura de lectura por tiles ====================
 
-# D8 estilo Esri: 1=E, 2=SE, 4=S, 8=SW, 16=W, 32=NW, 64=N, 128=NE
-VALID_CODES = {1, 2, 4, 8, 16, 32, 64, 128}
+# D8 estilo Esri: 1=E, 2=SE, 4=S, 8=SW, 16=W, 32=NW, 64=N, 128=NE.
+# Un vecino pertenece a la cuenca si su código es exactamente el que apunta a la
+# celda actual, así que basta una comparación entera (sin validar el código aparte)
 UPSTREAM_NEIGHBORS = [
     (-1, -1, 2),   # NW -> SE
     (-1,  0, 4),   # N  -> S
@@ -62,8 +65,159 @@ UPSTREAM_NEIGHBORS = [
     ( 1,  1, 32),  # SE -> NW
 ]
 
+# Los mismos vecinos como arrays (para el núcleo compilado)
+_UP_DR = np.array([n[0] for n in UPSTREAM_NEIGHBORS], dtype=np.int64)
+_UP_DC = np.array([n[1] for n in UPSTREAM_NEIGHBORS], dtype=np.int64)
+_UP_NEED = np.array([n[2] for n in UPSTREAM_NEIGHBORS], dtype=np.int64)
+
+# Paso río-abajo por código D8 (fila, columna), para el recorrido del complemento
+D8_DOWN = {1: (0, 1), 2: (1, 1), 4: (1, 0), 8: (1, -1),
+           16: (0, -1), 32: (-1, -1), 64: (-1, 0), 128: (-1, 1)}
+_DOWN_CODE = np.array(list(D8_DOWN.keys()), dtype=np.int64)
+_DOWN_DR = np.array([d[0] for d in D8_DOWN.values()], dtype=np.int64)
+_DOWN_DC = np.array([d[1] for d in D8_DOWN.values()], dtype=np.int64)
+
+# Fracción de la malla a partir de la cual se delimita por el complemento (río-abajo)
+DOWNSTREAM_FILL_MIN_FRACTION = 0.5
+
+# Memoria máxima (bytes) para hacer el BFS sobre FlowDir completo en RAM
+IN_MEMORY_BFS_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _bfs_upstream_py(fdir, r0, c0):
+    """
+    BFS río-arriba sobre FlowDir completo en memoria (pila de índices planos).
+    Retorna (inbasin uint8 del tamaño de fdir, min_r, max_r, min_c, max_c).
+    """
+    H, W = fdir.shape
+    inbasin = np.zeros((H, W), dtype=np.uint8)
+    stack = np.empty(1 << 16, dtype=np.int64)
+    stack[0] = r0 * W + c0
+    sp = 1
+    inbasin[r0, c0] = 1
+
+    min_r = max_r = r0
+    min_c = max_c = c0
+
+    while sp > 0:
+        sp -= 1
+        r = stack[sp] // W
+        c = stack[sp] - r * W
+        if r < min_r: min_r = r
+        if r > max_r: max_r = r
+        if c < min_c: min_c = c
+        if c > max_c: max_c = c
+
+        for k in range(8):
+            rr = r + _UP_DR[k]
+            cc = c + _UP_DC[k]
+            if rr < 0 or rr >= H or cc < 0 or cc >= W:
+                continue
+            if inbasin[rr, cc] != 0 or fdir[rr, cc] != _UP_NEED[k]:
+                continue
+            inbasin[rr, cc] = 1
+            if sp == stack.shape[0]:
+                grown = np.empty(stack.shape[0] * 2, dtype=np.int64)
+                grown[:sp] = stack
+                stack = grown
+            stack[sp] = rr * W + cc
+            sp += 1
+
+    return inbasin, min_r, max_r, min_c, max_c
+
+
+def _basin_by_downstream_py(fdir, r0, c0):
+    """
+    Cuenca por recorrido río-abajo (complemento): cada celda sigue su código D8
+    (un solo paso por celda) hasta una celda ya etiquetada, la semilla, el borde,
+    un código inválido o un ciclo, y todo el camino recibe esa etiqueta.
+    Recorre la malla completa una vez con acceso casi secuencial, así que conviene
+    cuando la cuenca ocupa más de la mitad del ráster. Mismo retorno que _bfs_upstream_py.
+    """
+    H, W = fdir.shape
+    # 0 = sin visitar, 1 = cuenca, 2 = fuera, 3 = en el camino actual
+    state = np.zeros((H, W), dtype=np.uint8)
+    state[r0, c0] = 1
+    path = np.empty(1 << 12, dtype=np.int64)
+
+    min_r = max_r = r0
+    min_c = max_c = c0
+
+    for r_start in range(H):
+        for c_start in range(W):
+            if state[r_start, c_start] != 0:
+                continue
+            n = 0
+            r = r_start
+            c = c_start
+            label = 2
+            while True:
+                s = state[r, c]
+                if s == 1 or s == 2:
+                    label = s
+                    break
+                if s == 3:
+                    break  # ciclo: no drena a la semilla
+                state[r, c] = 3
+                if n == path.shape[0]:
+                    grown = np.empty(path.shape[0] * 2, dtype=np.int64)
+                    grown[:n] = path
+                    path = grown
+                path[n] = r * W + c
+                n += 1
+
+                code = fdir[r, c]
+                k = -1
+                for j in range(8):
+                    if code == _DOWN_CODE[j]:
+                        k = j
+                        break
+                if k < 0:
+                    break  # sumidero / nodata
+                r += _DOWN_DR[k]
+                c += _DOWN_DC[k]
+                if r < 0 or r >= H or c < 0 or c >= W:
+                    break  # sale por el borde
+
+            for i in range(n):
+                rr = path[i] // W
+                cc = path[i] - rr * W
+                state[rr, cc] = label
+                if label == 1:
+                    if rr < min_r: min_r = rr
+                    if rr > max_r: max_r = rr
+                    if cc < min_c: min_c = cc
+                    if cc > max_c: max_c = cc
+
+    # Reutilizar el mismo buffer como máscara 0/1
+    for r in range(H):
+        for c in range(W):
+            if state[r, c] != 1:
+                state[r, c] = 0
+
+    return state, min_r, max_r, min_c, max_c
+
+
+# Núcleo del BFS compilado con Numba (si está disponible)
+try:
+    from numba import njit
+    try:
+        # nogil: el máximo global de FlowAccum se lee en paralelo con el BFS
+        _bfs_upstream = njit(cache=True, nogil=True)(_bfs_upstream_py)
+        _basin_by_downstream = njit(cache=True, nogil=True)(_basin_by_downstream_py)
+    except RuntimeError:
+        # Sin ubicación para caché en disco (p.ej. ejecutable congelado): compilar en memoria
+        _bfs_upstream = njit(nogil=True)(_bfs_upstream_py)
+        _basin_by_downstream = njit(nogil=True)(_basin_by_downstream_py)
+    NUMBA_AVAILABLE = True
+except ImportError:
+    _bfs_upstream = _bfs_upstream_py
+    _basin_by_downstream = _basin_by_downstream_py
+    NUMBA_AVAILABLE = False
+
+
 class TileCache:
-    """Caché LRU de tiles para ráster grande."""
+    """Caché de tiles para ráster grande (reemplazo CLOCK sobre ranuras fijas)."""
     def __init__(self, ds: rasterio.io.DatasetReader, preferred_block=1024, max_tiles_in_mem=64):
         self.ds = ds
         try:
@@ -73,7 +227,14 @@ class TileCache:
         except Exception:
             self.tile_h = self.tile_w = preferred_block
         self.max_tiles_in_mem = max_tiles_in_mem
-        self._lru: "OrderedDict[Tuple[int,int], np.ndarray]" = OrderedDict()
+        # (tr, tc) -> ranura; en un acierto sólo se marca el bit de referencia
+        # (sin reordenar como un LRU); al fallar, la manecilla busca una ranura
+        # sin referencia reciente
+        self._slots: Dict[Tuple[int, int], int] = {}
+        self._keys = [None] * max_tiles_in_mem
+        self._buf = [None] * max_tiles_in_mem
+        self._ref = [False] * max_tiles_in_mem
+        self._hand = 0
 
     def tile_index(self, row: int, col: int):
         tr = row // self.tile_h
@@ -94,28 +255,77 @@ class TileCache:
 
     def get(self, tr: int, tc: int):
         key = (tr, tc)
-        if key in self._lru:
-            arr = self._lru.pop(key)
-            self._lru[key] = arr
-            return arr
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._ref[slot] = True
+            return self._buf[slot]
         arr = self._read_tile(tr, tc)
         if arr is None:
             return None
-        self._lru[key] = arr
-        if len(self._lru) > self.max_tiles_in_mem:
-            self._lru.popitem(last=False)
+
+        # Segunda oportunidad: saltar (y limpiar) las ranuras referenciadas
+        while self._ref[self._hand]:
+            self._ref[self._hand] = False
+            self._hand = (self._hand + 1) % self.max_tiles_in_mem
+        slot = self._hand
+        old_key = self._keys[slot]
+        if old_key is not None:
+            del self._slots[old_key]
+        self._keys[slot] = key
+        self._buf[slot] = arr
+        self._ref[slot] = True
+        self._slots[key] = slot
+        self._hand = (slot + 1) % self.max_tiles_in_mem
         return arr
 
+    def mark_cold(self, tr: int, tc: int):
+        """Tile sin trabajo pendiente: primera candidata a desalojo (sin liberarla aún)"""
+        slot = self._slots.get((tr, tc))
+        if slot is not None:
+            self._ref[slot] = False
 
-def _compute_global_max_streaming(ds: rasterio.io.DatasetReader) -> float:
-    """Máximo global en streaming (no carga todo el ráster)."""
+
+def _max_of_windows(path, windows):
+    """Máximo de un grupo de bloques con un handle propio (rasterio no es thread-safe)."""
     maxv = None
-    for _, win in ds.block_windows(1):
-        arr = ds.read(1, window=win, masked=False)
-        m = np.nanmax(arr)
-        if maxv is None or m > maxv:
-            maxv = float(m)
-    return 0.0 if maxv is None else maxv
+    with rasterio.open(path) as ds:
+        for win in windows:
+            arr = ds.read(1, window=win, masked=False)
+            m = np.nanmax(arr)
+            if maxv is None or m > maxv:
+                maxv = float(m)
+    return maxv
+
+
+def _compute_global_max_streaming(path: str, max_workers=None) -> float:
+    """
+    Máximo global en streaming (no carga todo el ráster).
+    Recibe la ruta y no el dataset: corre en segundo plano mientras el hilo principal
+    usa su propio handle, y cada hilo abre el suyo (rasterio no es thread-safe).
+    Los bloques se reparten en grupos contiguos entre hilos; GDAL libera el GIL al leer.
+    """
+    with rasterio.open(path) as ds:
+        windows = [win for _, win in ds.block_windows(1)]
+    if not windows:
+        return 0.0
+    n_workers = max(1, min(max_workers or os.cpu_count() or 1, len(windows)))
+    size = -(-len(windows) // n_workers)
+    groups = [windows[i:i + size] for i in range(0, len(windows), size)]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        maxes = [m for m in pool.map(lambda g: _max_of_windows(path, g), groups) if m is not None]
+    return max(maxes) if maxes else 0.0
+
+
+def _rowcol(inv_transform, x, y):
+    """Fila/columna (floor, como ds.index) de (x, y) con la transformada inversa dada."""
+    col, row = inv_transform * (x, y)
+    return int(math.floor(row)), int(math.floor(col))
+
+
+def _xy_center(transform, row, col):
+    """Coordenadas del centro del píxel (como rasterio.transform.xy con offset='center')."""
+    return transform * (col + 0.5, row + 0.5)
 
 
 def _snap_to_network_on_disk(acc_ds, x, y, threshold_km2, pixel_area_km2, max_expand=16384):
@@ -123,9 +333,15 @@ def _snap_to_network_on_disk(acc_ds, x, y, threshold_km2, pixel_area_km2, max_ex
     Ajuste (snap) al píxel de acumulación ≥ umbral (km²), buscando en ventanas crecientes.
     Devuelve (x_snap, y_snap, row_acc, col_acc, accum_km2_en_snap) en grid de FlowAccum.
     """
-    row0, col0 = acc_ds.index(x, y)
+    transform = acc_ds.transform
+    row0, col0 = _rowcol(~transform, x, y)
     H, W = acc_ds.height, acc_ds.width
 
+    # Umbral en unidades del ráster (celdas), para comparar sin pasar el bloque a km²
+    thr_counts = threshold_km2 / pixel_area_km2
+    if np.issubdtype(np.dtype(acc_ds.dtypes[0]), np.integer):
+        thr_counts = int(np.ceil(thr_counts))
+
     radius = 256
     while radius <= max(H, W) and radius <= max_expand:
         rmin = max(0, row0 - radius)
@@ -134,61 +350,119 @@ def _snap_to_network_on_disk(acc_ds, x, y, threshold_km2, pixel_area_km2, max_ex
         cmax = min(W, col0 + radius + 1)
         win = Window(cmin, rmin, cmax - cmin, rmax - rmin)
 
-        block = acc_ds.read(1, window=win, masked=False).astype(np.float64) * pixel_area_km2
-        mask = block >= threshold_km2
+        block = acc_ds.read(1, window=win, masked=False)
+        mask = block >= thr_counts
 
-        if np.any(mask):
-            rr, cc = np.where(mask)
-            rr_abs = rr + rmin
-            cc_abs = cc + cmin
-            dr = rr_abs - row0
-            dc = cc_abs - col0
+        if mask.any():
+            rr, cc = np.nonzero(mask)
+            dr = rr - (row0 - rmin)
+            dc = cc - (col0 - cmin)
             idx = np.argmin(dr * dr + dc * dc)
-            row_snap = int(rr_abs[idx])
-            col_snap = int(cc_abs[idx])
+            row_snap = int(rr[idx]) + rmin
+            col_snap = int(cc[idx]) + cmin
 
-            x_snap, y_snap = rasterio.transform.xy(acc_ds.transform, row_snap, col_snap, offset="center")
-            v = float(acc_ds.read(1, window=Window(col_snap, row_snap, 1, 1), masked=False)[0, 0]) * pixel_area_km2
+            x_snap, y_snap = _xy_center(transform, row_snap, col_snap)
+            # El valor ya está en el bloque: sin releer el píxel del disco
+            v = float(block[rr[idx], cc[idx]]) * pixel_area_km2
             return x_snap, y_snap, row_snap, col_snap, v
 
         radius *= 2
 
     # Si no se encuentra, retorna el original
-    x_snap, y_snap = rasterio.transform.xy(acc_ds.transform, row0, col0, offset="center")
+    x_snap, y_snap = _xy_center(transform, row0, col0)
     v = float(acc_ds.read(1, window=Window(col0, row0, 1, 1), masked=False)[0, 0]) * pixel_area_km2
     return x_snap, y_snap, int(row0), int(col0), v
 
 
-def _delineate_basin_bfs_on_disk(fdir_ds, row_seed, col_seed, max_tiles_in_mem=64):
+def _grow_mask(mask, r0, c0, row, col, tile_h, tile_w, H, W):
+    """
+    Amplía la máscara de trabajo (ubicada en (r0, c0) de la malla) para cubrir
+    (row, col). Los bordes quedan alineados a tiles y, en la dirección en que se
+    sale, la máscara al menos duplica su tamaño (copias amortizadas).
+    Retorna (mascara, r0, c0).
+    """
+    h, w = mask.shape
+    r1, c1 = r0 + h, c0 + w
+    nr0 = max(0, min(row, r0 - h) // tile_h * tile_h) if row < r0 else r0
+    nr1 = min(H, -(-max(row + 1, r1 + h) // tile_h) * tile_h) if row >= r1 else r1
+    nc0 = max(0, min(col, c0 - w) // tile_w * tile_w) if col < c0 else c0
+    nc1 = min(W, -(-max(col + 1, c1 + w) // tile_w) * tile_w) if col >= c1 else c1
+
+    grown = np.zeros((nr1 - nr0, nc1 - nc0), dtype=np.uint8)
+    grown[r0 - nr0:r0 - nr0 + h, c0 - nc0:c0 - nc0 + w] = mask
+    return grown, nr0, nc0
+
+
+def _delineate_basin_bfs_on_disk(fdir_ds, row_seed, col_seed, max_tiles_in_mem=64,
+                                 expected_cells=None):
     """
     Delimitación de cuenca por BFS río-arriba (D8 Esri) leyendo tiles on-disk.
-    Retorna (mask_MBR, (min_r,max_r,min_c,max_c)), donde mask_MBR es uint8 0/1.
+    Retorna (mask_MBR, (min_r,max_r,min_c,max_c)), donde mask_MBR es uint8 0/1
+    (vista sobre la máscara de trabajo, sin copia: no modificarla).
+    Con Numba y si FlowDir cabe en memoria, el BFS se hace en un núcleo compilado
+    sobre el ráster completo (una sola lectura). Si expected_cells (estimado desde
+    FlowAccum) supera DOWNSTREAM_FILL_MIN_FRACTION de la malla, se usa el recorrido
+    río-abajo del complemento en lugar del BFS río-arriba.
     """
+    H, W = fdir_ds.height, fdir_ds.width
+    # Los núcleos compilados no validan índices: una semilla fuera del grid
+    # (FlowAccum y FlowDir con extensiones distintas) escribiría fuera del array
+    if not (0 <= row_seed < H and 0 <= col_seed < W):
+        raise RuntimeError(
+            f"La semilla (row={row_seed}, col={col_seed}) cae fuera del grid FlowDir ({H}x{W})."
+        )
+    fdir_bytes = H * W * (np.dtype(fdir_ds.dtypes[0]).itemsize + 1)  # FlowDir + máscara
+    if NUMBA_AVAILABLE and fdir_bytes <= IN_MEMORY_BFS_MAX_BYTES:
+        fdir = fdir_ds.read(1, masked=False)
+        if expected_cells is not None and expected_cells > DOWNSTREAM_FILL_MIN_FRACTION * H * W:
+            print("   - Recorrido río-abajo del complemento en memoria (Numba)")
+            kernel = _basin_by_downstream
+        else:
+            print("   - BFS en memoria (Numba)")
+            kernel = _bfs_upstream
+        inbasin, min_r, max_r, min_c, max_c = kernel(fdir, int(row_seed), int(col_seed))
+        out_mask = inbasin[min_r:max_r + 1, min_c:max_c + 1]
+        return out_mask, (int(min_r), int(max_r), int(min_c), int(max_c))
+
     cache = TileCache(fdir_ds, preferred_block=1024, max_tiles_in_mem=max_tiles_in_mem)
-    visited = {}
-    inbasin = {}
+
+    # Máscara plana de la cuenca (un acceso indexado por vecino en vez de buscar el
+    # tile en diccionarios), sólo sobre la región de tiles que ya alcanzó el BFS:
+    # este camino corre con FlowDir de varios GiB, y en Windows un np.zeros((H, W))
+    # se carga completo contra el límite de memoria comprometida
+    tile_h, tile_w = cache.tile_h, cache.tile_w
+    tr0, tc0, _, _ = cache.tile_index(row_seed, col_seed)
+    mr0, mc0 = tr0 * tile_h, tc0 * tile_w
+    inbasin = np.zeros((min(tile_h, H - mr0), min(tile_w, W - mc0)), dtype=np.uint8)
+    mh, mw = inbasin.shape
 
     min_r = max_r = row_seed
     min_c = max_c = col_seed
 
+    # Frontera como índices planos r*W + c: un int por celda, sin tuplas (r, c)
     q = deque()
-    q.append((row_seed, col_seed))
+    q.append(row_seed * W + col_seed)
 
-    tr0, tc0, lr0, lc0 = cache.tile_index(row_seed, col_seed)
-    tarr = cache.get(tr0, tc0)
-    if tarr is None:
+    if cache.get(tr0, tc0) is None:
         raise RuntimeError("No se pudo leer el tile inicial de FlowDir.")
+    inbasin[row_seed - mr0, col_seed - mc0] = 1
 
-    visited[(tr0, tc0)] = np.zeros_like(tarr, dtype=np.uint8)
-    inbasin[(tr0, tc0)] = np.zeros_like(tarr, dtype=np.uint8)
-    visited[(tr0, tc0)][lr0, lc0] = 1
-    inbasin[(tr0, tc0)][lr0, lc0] = 1
+    # Celdas pendientes en la cola por tile: cuando un tile se queda sin frontera
+    # se marca como frío para que el caché lo desaloje antes que los tiles activos
+    frontier = {(tr0, tc0): 1}
 
-    H, W = fdir_ds.height, fdir_ds.width
     total = 1
 
     while q:
-        r, c = q.popleft()
+        r, c = divmod(q.popleft(), W)
+        key = (r // tile_h, c // tile_w)
+        pending = frontier[key] - 1
+        if pending:
+            frontier[key] = pending
+        else:
+            del frontier[key]
+            cache.mark_cold(*key)
+
         if r < min_r: min_r = r
         if r > max_r: max_r = r
         if c < min_c: min_c = c
@@ -199,63 +473,89 @@ def _delineate_basin_bfs_on_disk(fdir_ds, row_seed, col_seed, max_tiles_in_mem=6
             cc = c + dc
             if rr < 0 or rr >= H or cc < 0 or cc >= W:
                 continue
+            # Sólo se marca al entrar en la cuenca: la celda drena a un único vecino,
+            # y vista desde otro vecino (código distinto) aún puede pertenecer
+            # .item(): entero de Python, sin crear un escalar de NumPy por vecino
+            mr = rr - mr0
+            mc = cc - mc0
+            inside = 0 <= mr < mh and 0 <= mc < mw
+            if inside and inbasin.item(mr, mc):
+                continue
 
             tr, tc, lr, lc = cache.tile_index(rr, cc)
             arr = cache.get(tr, tc)
             if arr is None:
                 continue
 
-            if (tr, tc) not in visited:
-                visited[(tr, tc)] = np.zeros_like(arr, dtype=np.uint8)
-            if (tr, tc) not in inbasin:
-                inbasin[(tr, tc)] = np.zeros_like(arr, dtype=np.uint8)
-
-            if visited[(tr, tc)][lr, lc] != 0:
-                continue
-
-            code = arr[lr, lc]
-            if code not in VALID_CODES:
-                visited[(tr, tc)][lr, lc] = 1
-                continue
-
-            if code == need_code:
-                inbasin[(tr, tc)][lr, lc] = 1
-                visited[(tr, tc)][lr, lc] = 1
-                q.append((rr, cc))
+            if arr.item(lr, lc) == need_code:
+                if not inside:
+                    inbasin, mr0, mc0 = _grow_mask(inbasin, mr0, mc0, rr, cc,
+                                                   tile_h, tile_w, H, W)
+                    mh, mw = inbasin.shape
+                    mr = rr - mr0
+                    mc = cc - mc0
+                inbasin[mr, mc] = 1
+                q.append(rr * W + cc)
+                frontier[(tr, tc)] = frontier.get((tr, tc), 0) + 1
                 total += 1
-            else:
-                visited[(tr, tc)][lr, lc] = 1
 
         if total % 500000 == 0:
             print(f"   - Visitadas ~{total:,} celdas…")
 
-    out_h = max_r - min_r + 1
-    out_w = max_c - min_c + 1
-    out_mask = np.zeros((out_h, out_w), dtype=np.uint8)
+    out_mask = inbasin[min_r - mr0:max_r - mr0 + 1, min_c - mc0:max_c - mc0 + 1]
+    return out_mask, (min_r, max_r, min_c, max_c)
 
-    for (tr, tc), tile_mask in inbasin.items():
-        row_off = tr * cache.tile_h
-        col_off = tc * cache.tile_w
-        r0 = max(row_off, min_r)
-        c0 = max(col_off, min_c)
-        r1 = min(row_off + tile_mask.shape[0], max_r + 1)
-        c1 = min(col_off + tile_mask.shape[1], max_c + 1)
-        if r1 <= r0 or c1 <= c0:
-            continue
 
-        rr0 = r0 - row_off
-        cc0 = c0 - col_off
-        rr1 = rr0 + (r1 - r0)
-        cc1 = cc0 + (c1 - c0)
+# ============================== Escritura de AccumArea ==============================
 
-        or0 = r0 - min_r
-        oc0 = c0 - min_c
-        or1 = or0 + (r1 - r0)
-        oc1 = oc0 + (c1 - c0)
+def _write_accumarea_blocks(dst, acc_src, src_offset, basin_mask, mask_offset, pixel_area_km2, scale_factor):
+    """
+    Escribe AccumArea bloque a bloque (memoria acotada a un tile de salida).
+    - acc_src: FlowAccum en la malla de FlowDir; la fila/col (0, 0) de dst es
+      src_offset en acc_src
+    - basin_mask: máscara MBR de la cuenca, ubicada en mask_offset dentro de dst
+    Sólo se leen de FlowAccum los tiles que tocan la cuenca.
+    """
+    src_r, src_c = src_offset
+    mr0, mc0 = mask_offset
+    mr1 = mr0 + basin_mask.shape[0]
+    mc1 = mc0 + basin_mask.shape[1]
+
+    for _, win in dst.block_windows(1):
+        wr0, wc0 = int(win.row_off), int(win.col_off)
+        wr1, wc1 = wr0 + int(win.height), wc0 + int(win.width)
+        block = np.zeros((wr1 - wr0, wc1 - wc0), dtype=np.uint32)
+
+        # Intersección del tile con el MBR de la cuenca
+        r0, r1 = max(wr0, mr0), min(wr1, mr1)
+        c0, c1 = max(wc0, mc0), min(wc1, mc1)
+        if r1 > r0 and c1 > c0:
+            sel = basin_mask[r0 - mr0:r1 - mr0, c0 - mc0:c1 - mc0].view(bool)
+            if sel.any():
+                counts = acc_src.read(
+                    1, window=Window(src_c + c0, src_r + r0, c1 - c0, r1 - r0), masked=False
+                )
+                basin_km2 = np.multiply(counts[sel], pixel_area_km2, dtype=np.float64)
+                basin_km2 *= scale_factor
+                block[r0 - wr0:r1 - wr0, c0 - wc0:c1 - wc0][sel] = basin_km2.astype(np.uint32)
 
-        out_mask[or0:or1, oc0:oc1] |= tile_mask[rr0:rr1, cc0:cc1].astype(np.uint8)
+        dst.write(block, 1, window=win)
 
-    return out_mask, (min_r, max_r, min_c, max_c)
+
+# ============================ Vectorización de la cuenca ===========================
+
+def _vectorize_basin(basin_mask, transform):
+    """
+    Polígono de la cuenca a partir de la máscara MBR (uint8 0/1).
+    shapes() sigue los bordes de los píxeles, así que el área del polígono coincide
+    con el área reportada; sólo se poligoniza la ventana MBR (transform del MBR).
+    """
+    # basin_mask ya es uint8 0/1: se pasa tal cual y como vista bool para mask=
+    watershed_shapes = shapes(basin_mask, mask=basin_mask.view(bool), transform=transform)
+    geoms = [shape(geom) for geom, val in watershed_shapes if val == 1]
+    if not geoms:
+        raise ValueError("No se pudo generar la geometría de la cuenca.")
+    return unary_union(geoms) if len(geoms) > 1 else geoms[0]
 
 
 # =============================== FUNCIÓN PRINCIPAL ===============================
@@ -297,10 +597,12 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
             print(f"   - Extensión FlowDir: {extent}")
             print()
 
-            # 2) Máximo global de FlowAccum (en su propio grid)
-            print("2. Calculando acumulación de flujo (máximo global)…")
-            acc_max = _compute_global_max_streaming(acc_ds)
-            print(f"   ✓ Valor máximo de acumulación (celdas FlowAccum): {acc_max}")
+            # 2) Máximo global de FlowAccum (en su propio grid): lectura de todo el
+            # ráster en segundo plano mientras se calculan áreas, snap y cuenca
+            print("2. Calculando acumulación de flujo (máximo global, en segundo plano)…")
+            max_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="acc_max")
+            acc_max_future = max_pool.submit(_compute_global_max_streaming, acc_ds.name)
+            max_pool.shutdown(wait=False)
             print()
 
             # 3) Áreas por píxel
@@ -334,7 +636,7 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
                 acc_ds, lon, lat, threshold_km2=float(threshold), pixel_area_km2=PixelArea_ACC
             )
             # La semilla para FlowDir es el píxel de FlowDir más cercano a (x_snap, y_snap)
-            row_seed, col_seed = fdir_ds.index(x_snap, y_snap)
+            row_seed, col_seed = _rowcol(~fdir_ds.transform, x_snap, y_snap)
             print(f"   ✓ Punto ajustado: ({x_snap:.6f}, {y_snap:.6f})")
             print(f"   - Área acumulada en el punto ajustado: {accum_at_snap:.2f} km²")
             print(f"   - Semilla en grid FlowDir: row={row_seed}, col={col_seed}")
@@ -343,13 +645,16 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
             # 5) Delimitación de cuenca (BFS río-arriba) en FlowDir
             print("5. Delimitando cuenca hidrográfica…")
             basin_mask, (rmin, rmax, cmin, cmax) = _delineate_basin_bfs_on_disk(
-                fdir_ds, row_seed=row_seed, col_seed=col_seed, max_tiles_in_mem=64
+                fdir_ds, row_seed=row_seed, col_seed=col_seed, max_tiles_in_mem=64,
+                expected_cells=accum_at_snap / PixelArea_FDIR if PixelArea_FDIR > 0 else None,
             )
             basin_cells = int(basin_mask.sum())
             basin_area_km2 = basin_cells * PixelArea_FDIR
             print(f"   ✓ Cuenca delimitada")
             print(f"   - Celdas: {basin_cells}")
             print(f"   - Área: {basin_area_km2:.2f} km²")
+            acc_max = acc_max_future.result()
+            print(f"   - Valor máximo de acumulación (celdas FlowAccum): {acc_max}")
             print()
 
             # 6) Guardar resultados
@@ -369,35 +674,21 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
             # Transform de la subventana (en la malla de FlowDir)
             transform_clip = rasterio.windows.transform(win_clip, fdir_ds.transform)
 
-            # Remuestrear FlowAccum a la malla/ventana de FlowDir (solo lo necesario)
-            print("   - Remuestreando FlowAccum a la malla de FlowDir (ventana de salida)…")
-            with WarpedVRT(
-                acc_ds,
-                crs=fdir_ds.crs,
-                transform=transform_clip,
-                width=out_w,
-                height=out_h,
-                resampling=Resampling.nearest  # preserva conteos
-            ) as acc_vrt:
-                acc_clip_counts = acc_vrt.read(1, masked=False).astype(np.float64)
-
-            # Convertir a km² con el área por píxel del grid original de FlowAccum
-            acc_clip_km2 = acc_clip_counts * PixelArea_ACC
+            # FlowAccum en la ventana de salida: lectura directa si ambos rásteres
+            # comparten malla; si no, remuestrear a la de FlowDir (solo lo necesario)
+            grids_aligned = (
+                acc_ds.crs == fdir_ds.crs
+                and acc_ds.transform.almost_equals(fdir_ds.transform)
+                and (acc_ds.width, acc_ds.height) == (W, H)
+            )
 
-            # Construir máscara de cuenca en ventana con buffer
+            # Ventana de la cuenca (MBR) dentro de la ventana con buffer
             r0 = rmin - rmin_b
             c0 = cmin - cmin_b
-            rb = r0 + (rmax - rmin + 1)
-            cb = c0 + (cmax - cmin + 1)
-            basin_mask_buffer = np.zeros((out_h, out_w), dtype=np.uint8)
-            basin_mask_buffer[r0:rb, c0:cb] = basin_mask
-
-            acc_masked = acc_clip_km2.copy()
-            acc_masked[basin_mask_buffer == 0] = 0.0
 
-            # Escalado y escritura
+            # Escalado y escritura: km² (área por píxel del grid original de FlowAccum)
+            # x1000 sólo en las celdas de la cuenca; el resto queda en 0 (nodata)
             scale_factor = 1000  # km² * 1000
-            acc_scaled = (acc_masked * scale_factor).astype(np.uint32)
 
             output_accumarea = os.path.join(PathOut, "02-Rasters", "AccumArea.tif")
             print("   - Escribiendo AccumArea.tif…")
@@ -417,7 +708,26 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
                 blockysize=256,
                 BIGTIFF="IF_SAFER"
             ) as dst:
-                dst.write(acc_scaled, 1)
+                if grids_aligned:
+                    print("   - FlowAccum ya está en la malla de FlowDir (sin remuestreo)")
+                    _write_accumarea_blocks(
+                        dst, acc_ds, (rmin_b, cmin_b), basin_mask, (r0, c0),
+                        PixelArea_ACC, scale_factor
+                    )
+                else:
+                    print("   - Remuestreando FlowAccum a la malla de FlowDir (ventana de salida)…")
+                    with WarpedVRT(
+                        acc_ds,
+                        crs=fdir_ds.crs,
+                        transform=transform_clip,
+                        width=out_w,
+                        height=out_h,
+                        resampling=Resampling.nearest  # preserva conteos
+                    ) as acc_vrt:
+                        _write_accumarea_blocks(
+                            dst, acc_vrt, (0, 0), basin_mask, (r0, c0),
+                            PixelArea_ACC, scale_factor
+                        )
                 dst.update_tags(
                     scale_factor=scale_factor,
                     units='km2_x1000',
@@ -433,11 +743,7 @@ def C01_BasinDelineation(PathOut, Path_FlowDir, Path_FlowAccum, lat, lon, thresh
                 fdir_ds.transform.a, fdir_ds.transform.b, fdir_ds.transform.c + cmin * fdir_ds.transform.a,
                 fdir_ds.transform.d, fdir_ds.transform.e, fdir_ds.transform.f + rmin * fdir_ds.transform.e
             )
-            watershed_shapes = list(shapes(basin_mask.astype(np.uint8), mask=basin_mask, transform=new_transform))
-            geoms = [shape(geom) for geom, val in watershed_shapes if val == 1]
-            if not geoms:
-                raise ValueError("No se pudo generar la geometría de la cuenca.")
-            geom_u = unary_union(geoms) if len(geoms) > 1 else geoms[0]
+            geom_u = _vectorize_basin(basin_mask, new_transform)
 
             gdf = gpd.GeoDataFrame({
                 'area_km2':   [float(basin_area_km2)],
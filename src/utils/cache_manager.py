@@ -7,6 +7,11 @@ import os
 import time
 from pathlib import Path
 
+# Archivos que se gestionan solos y no deben borrarse archivo a archivo: el índice
+# SQLite de teselas (y su -wal/-shm) tiene su propio desalojo LRU por filas
+# (ver tile_fetcher.TILE_DB_MAX_MB)
+SELF_MANAGED_PREFIXES = ("tiles.sqlite",)
+
 
 class CacheManager:
     """Gestiona el tamaño del caché eliminando archivos viejos cuando se excede el límite."""
@@ -23,12 +28,14 @@ class CacheManager:
         self.target_size_bytes = target_size_mb * 1024 * 1024
 
     def get_cache_size(self):
-        """Calcula el tamaño total del caché en bytes."""
+        """Calcula el tamaño total del caché en bytes (sin el índice de teselas)."""
         total_size = 0
         file_count = 0
         try:
             for dirpath, dirnames, filenames in os.walk(self.cache_dir):
                 for filename in filenames:
+                    if filename.startswith(SELF_MANAGED_PREFIXES):
+                        continue
                     file_path = os.path.join(dirpath, filename)
                     if os.path.exists(file_path):
                         total_size += os.path.getsize(file_path)
@@ -44,6 +51,8 @@ class CacheManager:
         try:
             for dirpath, dirnames, filenames in os.walk(self.cache_dir):
                 for filename in filenames:
+                    if filename.startswith(SELF_MANAGED_PREFIXES):
+                        continue
                     file_path = os.path.join(dirpath, filename)
                     if os.path.exists(file_path):
                         try:
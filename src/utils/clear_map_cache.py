@@ -14,6 +14,8 @@ import shutil
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.core.map_cache_config import get_cache_directory
+from src.utils.cache_manager import SELF_MANAGED_PREFIXES
+from src.utils.tile_fetcher import clear_tile_cache
 
 def clear_cache():
     cache_dir = get_cache_directory()
@@ -42,8 +44,19 @@ def clear_cache():
 
         respuesta = input(f"\n¿Eliminar TODO el caché ({total_size_mb:.1f} MB)? (s/n): ")
         if respuesta.lower() == 's':
-            shutil.rmtree(cache_dir)
-            os.makedirs(cache_dir, exist_ok=True)
+            # Índice de teselas: se vacía con SQLite (puede estar abierto por la
+            # aplicación); borrar el archivo dejaría -wal/-shm huérfanos
+            deleted = clear_tile_cache()
+            print(f"✓ Índice de teselas vaciado ({deleted} teselas)")
+
+            for entry in os.listdir(cache_dir):
+                if entry.startswith(SELF_MANAGED_PREFIXES):
+                    continue
+                entry_path = os.path.join(cache_dir, entry)
+                if os.path.isdir(entry_path):
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                else:
+                    os.remove(entry_path)
             print("✓ Caché eliminado completamente")
             print("  Los tiles se descargarán nuevamente cuando navegues el mapa.")
         else:
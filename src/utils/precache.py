@@ -2,6 +2,8 @@
 from typing import Tuple
 import contextily as ctx
 
+from .tile_fetcher import prefetch_bounds
+
 def precache_region_latlon(
     bbox_wgs84: Tuple[float, float, float, float],
     zmin: int,
@@ -37,10 +39,9 @@ def precache_region_latlon(
                 sub_lat_min = lats[j]
                 sub_lat_max = lats[j + 1]
                 try:
-                    # Esto descarga (si hace falta) y guarda en caché local
-                    _img, _ext = ctx.bounds2img(
-                        sub_lon_min, sub_lat_min, sub_lon_max, sub_lat_max,
-                        source=src, zoom=z, ll=True, use_cache=True
+                    # Esto descarga en paralelo (si hace falta) y guarda en caché local
+                    prefetch_bounds(
+                        src, (sub_lon_min, sub_lat_min, sub_lon_max, sub_lat_max), z, ll=True
                     )
                 except Exception as e:
                     print(f"[z={z}] cell=({i},{j}) error: {e}")
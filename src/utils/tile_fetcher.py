@@ -0,0 +1,393 @@
+# src/utils/tile_fetcher.py
+"""
+Descarga de teselas (tiles) de mapas base en paralelo.
+
+ctx.bounds2img descarga las teselas de un BBOX una tras otra; aquí se enumeran
+con mercantile y se descargan en un pool de hilos. Las teselas decodificadas
+se guardan en un único índice SQLite (modo WAL) dentro de la caché de mapas
+(AppData): un SELECT por mosaico y un INSERT por lote, sin un archivo por tesela.
+Las teselas se guardan comprimidas en WebP (20-40% menos que PNG).
+El índice tiene su propio presupuesto en bytes (TILE_DB_MAX_MB): al superarlo se
+eliminan las filas de uso más antiguo (LRU), no el archivo completo.
+"""
+import atexit
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
+
+import contextily as ctx
+import mercantile
+import numpy as np
+import requests
+from PIL import Image, features
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..core.map_cache_config import get_cache_directory
+
+# Descargas simultáneas (limitado para no saturar al proveedor)
+MAX_CONNECTIONS = 16
+
+# Base de datos de teselas dentro de la caché de mapas
+_DB_FILENAME = "tiles.sqlite"
+_DB_LOCK = threading.Lock()
+_DB_CONN = None
+
+# Versión del esquema (PRAGMA user_version); v2: blobs WebP en vez de RGBA crudo;
+# v3: tamaño y último acceso por fila (desalojo LRU)
+_DB_SCHEMA_VERSION = 3
+
+# Presupuesto del índice de teselas: al pasar de MAX se desalojan las teselas de
+# uso más antiguo hasta quedar en TARGET (el archivo reutiliza las páginas libres)
+TILE_DB_MAX_MB = 300
+TILE_DB_TARGET_MB = 200
+_DB_BYTES = 0  # bytes de teselas en el índice (aprox. entre desalojos)
+
+# Tamaño de lote para la precarga (teselas por INSERT)
+PRECACHE_BATCH_SIZE = 100
+
+# Formato de las teselas en caché: WebP si Pillow trae libwebp, si no PNG
+TILE_FORMAT = "WEBP" if features.check("webp") else "PNG"
+_WEBP_QUALITY = 85
+_WEBP_METHOD = 4
+
+_POOL = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="tiles")
+
+# Descargas en curso {tile_url: Future}: peticiones repetidas de la misma tesela
+# (pans/zooms rápidos con teselas solapadas) esperan al mismo Future
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Sesión HTTP compartida: reutiliza conexiones keep-alive (sin handshake TCP+TLS
+# por tesela) y reintenta errores transitorios del servidor con backoff
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=MAX_CONNECTIONS,
+    pool_maxsize=2 * MAX_CONNECTIONS,
+    max_retries=Retry(total=5, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.headers["user-agent"] = getattr(ctx.tile, "USER_AGENT", "contextily")
+
+# Timeout por tesela (s)
+_TIMEOUT = 5
+
+
+def tiles_for_bounds(
+    west: float, south: float, east: float, north: float, zoom: int, ll: bool = False
+) -> List[mercantile.Tile]:
+    """
+    Teselas (x, y, z) que cubren un BBOX a un nivel de zoom.
+    - ll=False: BBOX en Web Mercator (EPSG:3857), como en _draw_basemap
+    - ll=True: BBOX en WGS84 (lon/lat)
+    """
+    if not ll:
+        west, south = mercantile.lnglat(west, south)
+        east, north = mercantile.lnglat(east, north)
+    return list(mercantile.tiles(west, south, east, north, [int(zoom)]))
+
+
+def _provider_key(provider) -> str:
+    """Clave de un proveedor en la caché: hash de su plantilla de URL (distingue estilos)"""
+    template = provider.get("url", str(provider)) if hasattr(provider, "get") else str(provider)
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:16]
+
+
+def _db():
+    """Conexión compartida (protegida con _DB_LOCK) al índice SQLite de teselas"""
+    global _DB_CONN, _DB_BYTES
+    if _DB_CONN is None:
+        path = os.path.join(get_cache_directory(), _DB_FILENAME)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL: lecturas concurrentes con escrituras y commits sin fsync por lote
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _DB_SCHEMA_VERSION:
+            # Caché de una versión anterior (formato de blob distinto): se descarta
+            conn.execute("DROP TABLE IF EXISTS tiles")
+            conn.execute(f"PRAGMA user_version = {_DB_SCHEMA_VERSION}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tiles ("
+            " provider TEXT NOT NULL, z INTEGER NOT NULL, x INTEGER NOT NULL, y INTEGER NOT NULL,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " atime INTEGER NOT NULL,"  # ms desde epoch
+            " PRIMARY KEY (provider, z, x, y))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tiles_atime ON tiles (atime)")
+        conn.commit()
+        _DB_BYTES = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tiles").fetchone()[0]
+        _DB_CONN = conn
+    return _DB_CONN
+
+
+def _evict_lru(conn) -> None:
+    """Desaloja las teselas de uso más antiguo si el índice supera TILE_DB_MAX_MB (con _DB_LOCK)"""
+    global _DB_BYTES
+    _DB_BYTES = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tiles").fetchone()[0]
+    if _DB_BYTES <= TILE_DB_MAX_MB * 1024 * 1024:
+        return
+
+    excess = _DB_BYTES - TILE_DB_TARGET_MB * 1024 * 1024
+    freed = 0
+    rowids = []
+    for rowid, size in conn.execute("SELECT rowid, size FROM tiles ORDER BY atime"):
+        rowids.append((rowid,))
+        freed += size
+        if freed >= excess:
+            break
+    conn.executemany("DELETE FROM tiles WHERE rowid = ?", rowids)
+    conn.commit()
+    _DB_BYTES -= freed
+    print(f"🧹 Caché de teselas: {len(rowids)} teselas antiguas eliminadas ({freed / (1024 * 1024):.1f} MB)")
+
+
+def _touch(provider_key: str, keys) -> None:
+    """Marca como usadas ahora las teselas leídas de la caché (orden LRU)"""
+    now = int(time.time() * 1000)
+    rows = [(now, provider_key, z, x, y) for z, x, y in keys]
+    if not rows:
+        return
+    try:
+        with _DB_LOCK:
+            conn = _db()
+            conn.executemany(
+                "UPDATE tiles SET atime = ? WHERE provider = ? AND z = ? AND x = ? AND y = ?",
+                rows,
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️ No se pudo actualizar el acceso de teselas en caché: {e}")
+
+
+def clear_tile_cache() -> int:
+    """
+    Vacía el índice de teselas a través de SQLite (seguro con la conexión abierta
+    o con otro proceso usándolo) y compacta el archivo. Retorna las teselas borradas.
+    """
+    global _DB_BYTES
+    with _DB_LOCK:
+        conn = _db()
+        deleted = conn.execute("DELETE FROM tiles").rowcount
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        _DB_BYTES = 0
+    return deleted
+
+
+def _close_db() -> None:
+    """Al salir: vuelca el WAL al archivo principal y cierra la conexión"""
+    global _DB_CONN
+    with _DB_LOCK:
+        if _DB_CONN is None:
+            return
+        try:
+            _DB_CONN.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            _DB_CONN.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo cerrar la caché de teselas: {e}")
+        _DB_CONN = None
+
+
+atexit.register(_close_db)
+
+
+def _select_range(provider_key: str, tiles: List[mercantile.Tile], columns: str):
+    """Un SELECT por nivel de zoom sobre el rango x/y que cubre las teselas pedidas"""
+    by_zoom = {}
+    for t in tiles:
+        by_zoom.setdefault(t.z, []).append(t)
+
+    rows = []
+    with _DB_LOCK:
+        conn = _db()
+        for z, zoom_tiles in by_zoom.items():
+            xs = [t.x for t in zoom_tiles]
+            ys = [t.y for t in zoom_tiles]
+            rows.extend(conn.execute(
+                f"SELECT z, x, y{columns} FROM tiles"
+                " WHERE provider = ? AND z = ? AND x BETWEEN ? AND ? AND y BETWEEN ? AND ?",
+                (provider_key, z, min(xs), max(xs), min(ys), max(ys)),
+            ).fetchall())
+    return rows
+
+
+def _encode(array: np.ndarray) -> bytes:
+    """Comprime una tesela RGBA para la caché (WebP con pérdida imperceptible)"""
+    with io.BytesIO() as buffer:
+        image = Image.fromarray(np.ascontiguousarray(array, dtype=np.uint8), "RGBA")
+        if TILE_FORMAT == "WEBP":
+            image.save(buffer, "WEBP", quality=_WEBP_QUALITY, method=_WEBP_METHOD)
+        else:
+            image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+
+def _decode(data: bytes) -> np.ndarray:
+    """Decodifica una imagen (PNG/JPEG/WebP) a array RGBA uint8"""
+    with io.BytesIO(data) as image_stream:
+        image = Image.open(image_stream).convert("RGBA")
+        array = np.asarray(image)
+        image.close()
+    return array
+
+
+def _load_cached(provider_key: str, tiles: List[mercantile.Tile]) -> dict:
+    """Teselas ya en caché {(z, x, y): array RGBA}"""
+    cached = {}
+    for z, x, y, data in _select_range(provider_key, tiles, ", data"):
+        try:
+            cached[(z, x, y)] = _decode(data)
+        except Exception as e:
+            # Blob corrupto: se trata como ausente y se vuelve a descargar
+            print(f"⚠️ Tesela en caché ilegible ({z}/{x}/{y}): {e}")
+    _touch(provider_key, cached.keys())
+    return cached
+
+
+def _cached_keys(provider_key: str, tiles: List[mercantile.Tile]) -> set:
+    """Sólo las claves (z, x, y) en caché, sin leer los blobs (para la precarga)"""
+    return set(_select_range(provider_key, tiles, ""))
+
+
+def _store(provider_key: str, items) -> None:
+    """Inserta en lote las teselas descargadas [(Tile, array), ...]"""
+    global _DB_BYTES
+    now = int(time.time() * 1000)
+    rows = []
+    for t, array in items:
+        try:
+            blob = _encode(array)
+            rows.append((provider_key, t.z, t.x, t.y, sqlite3.Binary(blob), len(blob), now))
+        except Exception as e:
+            print(f"⚠️ No se pudo comprimir la tesela {t.z}/{t.x}/{t.y}: {e}")
+    if not rows:
+        return
+    try:
+        with _DB_LOCK:
+            conn = _db()
+            conn.executemany(
+                "INSERT OR IGNORE INTO tiles (provider, z, x, y, data, size, atime)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            _DB_BYTES += sum(row[5] for row in rows)
+            if _DB_BYTES > TILE_DB_MAX_MB * 1024 * 1024:
+                _evict_lru(conn)
+    except sqlite3.Error as e:
+        print(f"⚠️ No se pudieron guardar teselas en caché: {e}")
+
+
+def _download(tile_url: str):
+    """Descarga y decodifica una tesela (RGBA uint8)"""
+    return _session_retryer(tile_url, 0, 0)
+
+
+def _submit_unique(tile_url: str):
+    """Encola la descarga de una tesela, o reutiliza la que ya está en curso"""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(tile_url)
+        if future is not None:
+            return future
+        future = _POOL.submit(_download, tile_url)
+        _INFLIGHT[tile_url] = future
+
+    # Fuera del lock: si ya terminó, el callback se ejecuta aquí mismo
+    future.add_done_callback(lambda f: _forget_inflight(tile_url, f))
+    return future
+
+
+def _forget_inflight(tile_url: str, future):
+    """Quita una descarga terminada del registro de descargas en curso"""
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(tile_url) is future:
+            del _INFLIGHT[tile_url]
+
+
+def _download_missing(provider, provider_key: str, missing: List[mercantile.Tile]) -> dict:
+    """Descarga en paralelo las teselas que faltan y las guarda en un solo lote"""
+    urls = [provider.build_url(x=t.x, y=t.y, z=t.z) for t in missing]
+    futures = [_submit_unique(url) for url in urls]
+
+    downloaded = {}
+    for t, url, future in zip(missing, urls, futures):
+        try:
+            downloaded[(t.z, t.x, t.y)] = future.result()
+        except Exception as e:
+            print(f"⚠️ Error descargando tesela {url}: {e}")
+
+    _store(provider_key, [(t, downloaded[(t.z, t.x, t.y)]) for t in missing
+                          if (t.z, t.x, t.y) in downloaded])
+    return downloaded
+
+
+def fetch_tiles(provider, tiles: Iterable[mercantile.Tile]) -> list:
+    """
+    Lee de caché o descarga en paralelo varias teselas.
+    Retorna los arrays RGBA en el mismo orden que 'tiles'; None si alguna falló.
+    """
+    tiles = list(tiles)
+    if not tiles:
+        return []
+    provider_key = _provider_key(provider)
+
+    found = _load_cached(provider_key, tiles)
+    missing = [t for t in tiles if (t.z, t.x, t.y) not in found]
+    if missing:
+        found.update(_download_missing(provider, provider_key, missing))
+
+    return [found.get((t.z, t.x, t.y)) for t in tiles]
+
+
+def prefetch_bounds(
+    provider,
+    bounds: Tuple[float, float, float, float],
+    zoom: int,
+    ll: bool = False,
+) -> int:
+    """
+    Calienta la caché en disco con todas las teselas de un BBOX (precarga),
+    sin ensamblar mosaico ni leer las teselas que ya están en caché.
+    Retorna el número de teselas solicitadas.
+    """
+    west, south, east, north = bounds
+    tiles = tiles_for_bounds(west, south, east, north, zoom, ll=ll)
+    provider_key = _provider_key(provider)
+
+    cached = _cached_keys(provider_key, tiles)
+    missing = [t for t in tiles if (t.z, t.x, t.y) not in cached]
+
+    # Lotes acotados: memoria limitada y un INSERT por lote
+    for i in range(0, len(missing), PRECACHE_BATCH_SIZE):
+        _download_missing(provider, provider_key, missing[i:i + PRECACHE_BATCH_SIZE])
+    return len(tiles)
+
+
+def _session_retryer(tile_url: str, wait: float, max_retries: int):
+    """
+    Reemplazo de contextily.tile._retryer que descarga con la sesión compartida.
+    Los reintentos los hace el HTTPAdapter; wait/max_retries se mantienen por firma.
+    """
+    response = _SESSION.get(tile_url, timeout=_TIMEOUT)
+    response.raise_for_status()
+    return _decode(response.content)
+
+
+def install_session():
+    """
+    Hace que contextily (bounds2img y _fetch_tile cacheado) use la sesión compartida
+    cuando se le llama directamente. Se parchea _retryer y no _fetch_tile para no
+    alterar la clave de caché de joblib.
+    """
+    ctx.tile._retryer = _session_retryer
+
+
+install_session()
@@ -240,7 +240,9 @@ class SbNWindow(ctk.CTkToplevel):
             if success:
                 print("✅ Polígono de cuenca cargado exitosamente")
                 # Centrar vista en la cuenca
-                self.map_viewer.zoom_to_vector(str(watershed_shp), padding_factor=0.15)
+                self.map_viewer.zoom_to_vector(
+                    str(watershed_shp), padding_factor=0.15, layer_name="watershed_boundary"
+                )
             else:
                 print("❌ No se pudo cargar el polígono de cuenca")
 
@@ -410,18 +412,14 @@ class SbNWindow(ctk.CTkToplevel):
 
             print(f"Cargando raster: {raster_path}")
 
-            # Cargar el raster en el visor de mapa
+            # Cargar el raster en el visor de mapa (lectura en segundo plano)
             layer_name = f"SbN_{sbn_id}"
-            success = self.map_viewer.add_raster_layer(raster_path, layer_name, alpha=0.6)
-
-            if success:
-                self.loaded_rasters[sbn_id] = raster_path
-                print(f"✅ Raster SbN {sbn_id} cargado exitosamente")
+            success = self.map_viewer.add_raster_layer(
+                raster_path, layer_name, alpha=0.6,
+                callback=lambda ok: self._on_sbn_raster_loaded(sbn_id, raster_path, ok)
+            )
 
-                # Hacer zoom automático al raster recién cargado
-                self.map_viewer.zoom_to_raster(raster_path)
-                print(f"🔍 Zoom automático aplicado a SbN {sbn_id}")
-            else:
+            if not success:
                 # Desmarcar el checkbox si falla la carga
                 checkbox = self.sbn_checkboxes.get(sbn_id)
                 if checkbox:
@@ -438,16 +436,34 @@ class SbNWindow(ctk.CTkToplevel):
             if checkbox:
                 checkbox.deselect()
 
+    def _on_sbn_raster_loaded(self, sbn_id, raster_path, success):
+        """Termina la carga de un raster de SbN (llamado por el visor en el hilo de Tk)"""
+        if success:
+            self.loaded_rasters[sbn_id] = raster_path
+            print(f"✅ Raster SbN {sbn_id} cargado exitosamente")
+
+            # Hacer zoom automático al raster recién cargado
+            self.map_viewer.zoom_to_raster(raster_path)
+            print(f"🔍 Zoom automático aplicado a SbN {sbn_id}")
+        else:
+            # Desmarcar el checkbox si falla la carga
+            checkbox = self.sbn_checkboxes.get(sbn_id)
+            if checkbox:
+                checkbox.deselect()
+
     def _unload_sbn_raster(self, sbn_id):
         """Quitar raster de SbN del mapa"""
         try:
+            layer_name = f"SbN_{sbn_id}"
             if sbn_id in self.loaded_rasters:
-                layer_name = f"SbN_{sbn_id}"
                 success = self.map_viewer.remove_raster_layer(layer_name)
 
                 if success:
                     del self.loaded_rasters[sbn_id]
                     print(f"✅ Raster SbN {sbn_id} removido del mapa")
+            else:
+                # Aún se está leyendo: anular la carga en curso
+                self.map_viewer.remove_raster_layer(layer_name)
 
         except Exception as e:
             print(f"Error removiendo raster SbN {sbn_id}: {e}")
@@ -544,7 +544,9 @@ class WatershedDelimitationFolium(ctk.CTkToplevel):
                     linewidth=2
                 )
                 # Centrar y hacer zoom específico a la cuenca con margen mínimo
-                self.map_viewer.zoom_to_vector(str(watershed_shp_path), padding_factor=0.05)
+                self.map_viewer.zoom_to_vector(
+                    str(watershed_shp_path), padding_factor=0.05, layer_name="watershed"
+                )
 
             # Cerrar ventana de progreso antes del mensaje de éxito
             try:
@@ -692,11 +694,10 @@ class WatershedDelimitationFolium(ctk.CTkToplevel):
             if hasattr(self, 'define_sbn_btn'):
                 self.define_sbn_btn.configure(state="disabled")
 
-            # Borrar marcador anterior si existe
+            # Ocultar marcador anterior si existe (el visor reutiliza la misma Line2D)
             if hasattr(self, 'map_viewer') and self.map_viewer.current_marker:
                 try:
-                    self.map_viewer.current_marker.remove()
-                    self.map_viewer.current_marker = None
+                    self.map_viewer.current_marker.set_visible(False)
                     self.map_viewer.canvas.draw_idle()
                 except:
                     pass
@@ -1736,7 +1737,9 @@ class WatershedDelimitationFolium(ctk.CTkToplevel):
 
                 # Centrar y hacer zoom específico a la cuenca con margen mínimo
                 # if success_vector:
-                    self.map_viewer.zoom_to_vector(self.watershed_shapefile, padding_factor=0.05)
+                    self.map_viewer.zoom_to_vector(
+                        self.watershed_shapefile, padding_factor=0.05, layer_name="watershed"
+                    )
             else:
                 print("❌ map_viewer NO disponible")
 